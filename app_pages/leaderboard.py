@@ -0,0 +1,49 @@
+import streamlit as st
+
+from app_resources import get_review_store, get_sheet_mirror
+from perf import current_timer, track_cache
+from review_stats import ReviewStats
+from reviews import RATING_COLUMNS, RATING_KEYS
+
+perf_timer = current_timer()
+review_store = get_review_store()
+get_sheet_mirror()
+
+# Keyed on the store's (count, max id), so the arrays are rebuilt only after new reviews
+@track_cache(st.cache_resource, max_entries=2)
+def get_review_stats(store_version):
+    return ReviewStats.from_store(review_store)
+
+LEADERBOARD_RATINGS = {label.strip(): key for key, label in RATING_COLUMNS}
+LEADERBOARD_STATISTICS = {"Mean": "mean", "Median": "median", "Review count": "count"}
+
+st.title("Leaderboard & Compare")
+
+with perf_timer.stage("review stats"):
+    review_stats = get_review_stats(review_store.version())
+if not len(review_stats):
+    st.write("No reviews yet.")
+else:
+    rating_col, statistic_col = st.columns(2)
+    rating_label = rating_col.selectbox("Rating", list(LEADERBOARD_RATINGS), index=len(LEADERBOARD_RATINGS) - 1)
+    statistic_label = statistic_col.selectbox("Sort by", list(LEADERBOARD_STATISTICS))
+    min_col, top_col, order_col = st.columns(3)
+    most_reviews = int(review_stats.counts.max())
+    min_reviews = min_col.slider("Minimum reviews", 1, most_reviews, 1) if most_reviews > 1 else 1
+    top_n = top_col.selectbox("Show", [10, 20, 50, 100], index=1)
+    ascending = order_col.toggle("Lowest first")
+    positions = review_stats.leaderboard(LEADERBOARD_RATINGS[rating_label], LEADERBOARD_STATISTICS[statistic_label],
+                                         min_reviews=min_reviews, top=top_n, ascending=ascending)
+    if len(positions):
+        st.dataframe(review_stats.rows(positions), hide_index=True)
+    else:
+        st.write(f"No teacher has {min_reviews} or more reviews.")
+
+    compared = st.multiselect("Compare teachers", list(review_stats.names[review_stats.leaderboard(top=len(review_stats))]),
+                              max_selections=5)
+    if compared:
+        name_position = {name: i for i, name in enumerate(review_stats.names)}
+        rating_index = RATING_KEYS.index(LEADERBOARD_RATINGS[rating_label])
+        st.dataframe(review_stats.rows([name_position[name] for name in compared]), hide_index=True)
+        st.write(f"{rating_label} distribution")
+        st.bar_chart({name: review_stats.histograms[name_position[name], rating_index] for name in compared})
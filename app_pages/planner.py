@@ -0,0 +1,299 @@
+import io
+import multiprocessing
+
+import streamlit as st
+
+from app_resources import client_token, get_review_snapshot, get_timetable_store
+from perf import current_timer, register_cache
+from reviews import clean_name
+from slots import days, slot_to_cells, cell_to_slots, parse_slots, find_clashes
+from timetable_import import parse_import, plan_import
+from timetable_share import SHARE_PARAM, decode_share, encode_timetable, load_shared
+from timetable_solver import DEFAULT_WEIGHTS, parse_course_options, solve
+from timetable_render import (
+    render_timetable_html, export_pdf_cached, read_batch_csv, batch_export_zip, batch_export_pdf,
+    cell_view, cell_html, pdf_cache_info,
+)
+
+perf_timer = current_timer()
+register_cache("cell_view", cell_view.cache_info)
+register_cache("cell_html", cell_html.cache_info)
+register_cache("export_pdf_cached", pdf_cache_info)
+register_cache("decode_share", decode_share.cache_info)
+review_snapshot = get_review_snapshot()
+review_snapshot.refresh()
+
+# --- Clear form fields if needed (before widgets are created) ---
+# (No clearing after every entry)
+
+# --- State ---
+def get_state():
+    if "faculty_list" not in st.session_state:
+        st.session_state["faculty_list"] = []
+    if "timetable" not in st.session_state:
+        st.session_state["timetable"] = dict.fromkeys(cell_to_slots)
+    # Add form state for clearing
+    for key in ["course_code", "course_name", "faculty", "slot_str", "room"]:
+        if key not in st.session_state or st.session_state[key] is None:
+            st.session_state[key] = ""
+    return st.session_state
+state = get_state()
+
+# --- Shared link ---
+# A ?tt= link restores its timetable once per session; later edits aren't
+# overwritten on rerun while the parameter stays in the URL
+shared_token = st.query_params.get(SHARE_PARAM)
+if shared_token and state.get("loaded_share") != shared_token:
+    state["loaded_share"] = shared_token
+    try:
+        with perf_timer.stage("load shared timetable"):
+            state["timetable"], state["faculty_list"] = load_shared(shared_token)
+    except ValueError as e:
+        st.warning(f"Couldn't open the shared timetable: {e}")
+
+# --- UI Styling ---
+st.markdown("""
+    <style>
+    body, .main, .stApp {background-color: #181e29 !important; color: #fff;}
+    .ffcs-table {border-collapse: collapse; width: 100%; background: #181e29; color: #fff;}
+    .ffcs-table th, .ffcs-table td {border: 1px solid #232b3b; text-align: center; font-weight: bold;}
+    .ffcs-table th {background: #232b3b; color: #7ecfff;}
+    .ffcs-table .lunch {background: #232b3b; color: #ffb347;}
+    .ffcs-table .green {background: #2ecc40 !important; color: #fff;}
+    .ffcs-table .red {background: #e74c3c !important; color: #fff;}
+    .ffcs-table .empty {background: #181e29;}
+    .ffcs-table .period-label {background: #232b3b; color: #fff; font-weight: bold;}
+    .ffcs-table .theory-time {background: #bfcafc; color: #222; font-weight: bold;}
+    .ffcs-table .lab-time {background: #b3e0fc; color: #222; font-weight: bold;}
+    .ffcs-table td, .ffcs-table th {width: 110px; height: 60px; min-width: 110px; min-height: 60px; max-width: 110px; max-height: 60px; overflow: hidden;}
+    </style>
+""", unsafe_allow_html=True)
+
+st.title("FFCS Faculty Timetable")
+st.write("Add faculty directly to the timetable. No course management. No clashes allowed.")
+
+# --- Faculty Input Form ---
+st.subheader("Add Faculty")
+with st.form("add_faculty_form"):
+    course_code = st.text_input("Course Code", value=state["course_code"], key="course_code")
+    course_name = st.text_input("Course Name", value=state["course_name"], key="course_name")
+    faculty = st.text_input("Faculty Name", value=state["faculty"], key="faculty")
+    slot_str = st.text_input("Slot(s) (e.g. A1+A2+B1)", value=state["slot_str"], key="slot_str")
+    room = st.text_input("Room Number", value=state["room"], key="room")
+    submitted = st.form_submit_button("Add to Timetable")
+    clash_msg = ""
+    if submitted:
+        # Only slot_str is compulsory
+        if not slot_str.strip():
+            st.error("Slot(s) is a required field.")
+        else:
+            slots = parse_slots(slot_str)
+            taken_slots = [slot for entry in state["faculty_list"] for slot in parse_slots(entry["slots"])]
+            with perf_timer.stage("clash check"):
+                invalid_slots, input_clashes, timetable_clashes = find_clashes(slots, taken_slots)
+            clash_msgs = [f"Invalid slot: {slot}." for slot in invalid_slots]
+            for slot, other_slot, clash_on in input_clashes:
+                clash_msgs.append(f"Timing clash between {slot} and {other_slot} on {', '.join(clash_on)}.")
+            for slot, other_slot, clash_on in timetable_clashes:
+                clash_msgs.append(f"Timing clash: {slot} overlaps with {other_slot} (already in the timetable) on {', '.join(clash_on)}.")
+            clash = bool(clash_msgs)
+            clash_msg = "\n\n".join(clash_msgs)
+            cells_to_fill = {cell for slot in slots for cell in slot_to_cells.get(slot, [])}
+            if not clash:
+                for cell in cells_to_fill:
+                    state["timetable"][cell] = {
+                        "course_code": course_code,
+                        "course_name": course_name,
+                        "faculty": faculty,
+                        "slots": slot_str,
+                        "room": room
+                    }
+                state["faculty_list"].append({
+                    "course_code": course_code,
+                    "course_name": course_name,
+                    "faculty": faculty,
+                    "slots": slot_str,
+                    "room": room
+                })
+            else:
+                st.error(clash_msg or "Slot or timing clash detected.")
+
+# --- Bulk Import ---
+with st.expander("Bulk Import"):
+    st.write("Paste your registered courses from VTOP, or a CSV with `course_code`, `course_name`, `faculty`, "
+             "`slots` and `room` columns. Every row is checked at once; rows without problems are added together.")
+    import_text = st.text_area("Courses", key="import_text", height=150)
+    import_file = st.file_uploader("...or upload a CSV / text file", type=["csv", "txt"], key="import_file")
+    replace_timetable = st.checkbox("Replace my current timetable", key="import_replace")
+    if st.button("Import"):
+        text = import_file.getvalue().decode("utf-8-sig") if import_file is not None else import_text
+        with perf_timer.stage("bulk import"):
+            rows = parse_import(text)
+            timetable, faculty_list, problems = plan_import([entry for _, entry in rows], state["faculty_list"],
+                                                            replace=replace_timetable)
+        if not rows:
+            st.error("No courses with valid-looking slots found.")
+        else:
+            # Both keys change in the same rerun, so the preview never sees half an import
+            state["timetable"] = timetable
+            state["faculty_list"] = faculty_list
+            imported = sum(1 for found in problems if not found)
+            st.success(f"Imported {imported} of {len(rows)} courses.")
+            skipped = [
+                f"Line {line} ({entry['course_code'] or entry['slots']}): {'; '.join(found)}"
+                for (line, entry), found in zip(rows, problems) if found
+            ]
+            if skipped:
+                st.warning("Not imported:\n\n" + "\n\n".join(skipped))
+
+# --- Timetable Generator ---
+def faculty_rating(name):
+    summary = review_snapshot.teacher_summary(clean_name(name))
+    # Unreviewed faculty count as middling rather than as zero
+    return min(summary["means"]["overall"], 10) if summary else 5.0
+
+
+def apply_solution(courses, choices):
+    state["timetable"] = dict.fromkeys(cell_to_slots)
+    state["faculty_list"] = []
+    for course, choice in zip(courses, choices):
+        option = course["options"][choice]
+        entry = {
+            "course_code": course["course_code"],
+            "course_name": "",
+            "faculty": option["faculty"],
+            "slots": option["slots"],
+            "room": ""
+        }
+        for slot in parse_slots(option["slots"]):
+            for cell in slot_to_cells[slot]:
+                state["timetable"][cell] = entry
+        state["faculty_list"].append(entry)
+
+
+with st.expander("Timetable Generator"):
+    st.write("Enter one option per line as `COURSE CODE | Faculty | Slots`. "
+             "Lines with the same course code are alternatives for that course.")
+    options_text = st.text_area(
+        "Course options",
+        key="solver_options",
+        placeholder="CSE2001 | Dr. Geetha S | A1+TA1\nCSE2001 | Dr. Parvathi R | B1+TB1\nCSE2002 | Dr. Ganesan R | L1+L2"
+    )
+    pref1, pref2, pref3 = st.columns(3)
+    avoid_early = pref1.checkbox("Avoid 8 AM classes", value=True, key="solver_avoid_early")
+    fewest_days = pref2.checkbox("Fewest days on campus", value=True, key="solver_fewest_days")
+    prefer_rated = pref3.checkbox("Prefer highly rated faculty", value=True, key="solver_prefer_rated")
+    if st.button("Generate Timetables"):
+        courses = parse_course_options(options_text)
+        weights = {
+            "early": DEFAULT_WEIGHTS["early"] if avoid_early else 0,
+            "days": DEFAULT_WEIGHTS["days"] if fewest_days else 0,
+            "rating": DEFAULT_WEIGHTS["rating"] if prefer_rated else 0,
+        }
+        with perf_timer.stage("solver"):
+            solutions, complete = solve(courses, faculty_rating=faculty_rating, weights=weights)
+        st.session_state["solver_results"] = (courses, solutions, complete)
+
+    if "solver_results" in st.session_state:
+        courses, solutions, complete = st.session_state["solver_results"]
+        if not solutions:
+            st.error("No clash-free timetable exists for these options.")
+        elif not complete:
+            st.warning("Search stopped early; these are the best timetables found so far.")
+        for rank, solution in enumerate(solutions):
+            st.markdown(f"**Option {rank + 1}**: {solution['days']} days on campus, "
+                        f"{solution['early']} classes at 8 AM, average faculty rating {solution['rating']:.2f}")
+            st.dataframe([
+                {"Course Code": course["course_code"], "Faculty": course["options"][choice]["faculty"],
+                 "Slots": course["options"][choice]["slots"]}
+                for course, choice in zip(courses, solution["choices"])
+            ])
+            if st.button("Replace my timetable with this", key=f"apply_solution_{rank}"):
+                apply_solution(courses, solution["choices"])
+                st.success(f"Option {rank + 1} applied.")
+
+# --- Timetable Preview ---
+with st.expander("Timetable Preview", expanded=True):
+    with perf_timer.stage("render timetable"):
+        timetable_html = render_timetable_html(state["timetable"])
+    st.markdown(timetable_html, unsafe_allow_html=True)
+
+# --- Faculty List ---
+st.subheader("Faculty List")
+st.dataframe(state["faculty_list"])
+
+# --- Export as PDF ---
+if st.button("Export as PDF"):
+    with perf_timer.stage("export pdf"):
+        pdf_bytes = export_pdf_cached(state["timetable"], state["faculty_list"])
+    st.download_button(
+        label="Download PDF",
+        data=pdf_bytes,
+        file_name="ffcs_faculty_timetable.pdf",
+        mime="application/pdf"
+    )
+
+# --- Share Link ---
+if st.button("Share this timetable", disabled=not state["faculty_list"]):
+    token = encode_timetable(state["faculty_list"])
+    st.query_params[SHARE_PARAM] = token
+    state["loaded_share"] = token
+    page_url = getattr(st.context, "url", None) or ""
+    st.write("Anyone opening this link gets a copy of your timetable:")
+    st.code(f"{page_url.split('?')[0]}?{SHARE_PARAM}={token}", language=None)
+
+# --- Shared Timetables ---
+with st.expander("Shared Timetables"):
+    timetable_store = get_timetable_store()
+    st.write(f"{timetable_store.count()} timetables saved. Saving yours (anonymously) helps others see "
+             "who teaches what, which rooms are free and how popular each faculty is.")
+    save_col, delete_col = st.columns(2)
+    if save_col.button("Save my timetable", disabled=not state["faculty_list"]):
+        timetable_store.save(client_token(), state["faculty_list"])
+        st.success("Timetable saved; saving again replaces it.")
+    if delete_col.button("Remove my saved timetable"):
+        timetable_store.delete(client_token())
+        st.success("Saved timetable removed.")
+
+    query_slot = st.text_input("Slot (e.g. A1)", key="shared_slot").strip().upper()
+    query_course = st.text_input("Course Code", key="shared_course").strip().upper()
+    if query_slot and query_slot not in slot_to_cells:
+        st.warning(f"Unknown slot {query_slot}.")
+    elif query_slot:
+        with perf_timer.stage("shared timetable queries"):
+            if query_course:
+                teaching = timetable_store.faculty_for(query_course, query_slot)
+            query_days = sorted({day for day, _ in slot_to_cells[query_slot]}, key=days.index)
+            free = {day: timetable_store.free_rooms(query_slot, day) for day in query_days}
+        if query_course:
+            st.write(f"**Faculty teaching {query_course} in {query_slot}**")
+            st.dataframe([{"Faculty": name, "Students": students} for name, students in teaching], hide_index=True)
+        for day, rooms in free.items():
+            st.write(f"**Free rooms in {query_slot} on {day}**: {', '.join(rooms) or 'none known'}")
+
+    query_faculty = st.text_input("Faculty Name", key="shared_faculty").strip()
+    if query_faculty:
+        students = timetable_store.faculty_students(query_faculty, query_course or None)
+        st.write(f"{students} saved timetables picked {query_faculty}" + (f" for {query_course}." if query_course else "."))
+
+# --- Batch Export ---
+with st.expander("Batch Export"):
+    st.write("Upload a CSV with `student` and `slots` columns (optionally `course_code`, `course_name`, "
+             "`faculty`, `room`), one row per course, to print timetables for a whole batch at once.")
+    batch_file = st.file_uploader("Students CSV", type=["csv"], key="batch_csv")
+    batch_format = st.radio("Output", ["ZIP of PDFs", "Single multi-page PDF"], key="batch_format", horizontal=True)
+    if batch_file is not None and st.button("Export Batch"):
+        students = read_batch_csv(batch_file.getvalue().decode("utf-8-sig"))
+        with perf_timer.stage("batch export"):
+            if batch_format == "ZIP of PDFs":
+                buffer = io.BytesIO()
+                # The Streamlit server is multi-threaded, so fork could deadlock a worker
+                report = batch_export_zip(students, buffer, mp_context=multiprocessing.get_context("spawn"))
+                batch_bytes, file_name, mime = buffer.getvalue(), "ffcs_timetables.zip", "application/zip"
+            else:
+                batch_bytes, report = batch_export_pdf(students, None)
+                file_name, mime = "ffcs_timetables.pdf", "application/pdf"
+        skipped = [f"{student}: {problem}" for student, problems in report.items() for problem in problems]
+        if skipped:
+            st.warning("Skipped entries:\n\n" + "\n\n".join(skipped))
+        st.download_button(label=f"Download {len(report)} timetables", data=batch_bytes, file_name=file_name, mime=mime)
@@ -0,0 +1,213 @@
+import streamlit as st
+
+from app_resources import (
+    TEACHER_ROSTER, get_review_snapshot, get_sheet_mirror, get_thumbnail_cache, get_submission_guard,
+    client_fingerprint, client_network, submit_review,
+)
+from directory import load_directory
+from perf import current_timer, track_cache
+from reviews import COMMENT_COLUMN, RATING_COLUMNS, TEACHER_COLUMN, clean_name
+from teacher_search import TeacherSearchIndex
+
+perf_timer = current_timer()
+
+
+def calculate_overall_rating(reviews):
+    if reviews:
+        return sum(reviews) / len(reviews)
+    return 0
+
+
+with perf_timer.stage("review store"):
+    get_sheet_mirror()
+    # Teacher views read summaries and latest reviews from the snapshot, not the store
+    review_snapshot = get_review_snapshot()
+    review_snapshot.refresh()
+
+# Keyed on the roster's content hash, so it is rebuilt only when the roster changes
+@track_cache(st.cache_resource, max_entries=2)
+def get_search_index(roster_sha256):
+    return TeacherSearchIndex(load_directory(TEACHER_ROSTER).cleaned)
+
+MAX_SEARCH_RESULTS = 25
+
+# Compiled once per change of the roster (see directory.py); a rerun only stats the file
+with perf_timer.stage("load directory"):
+    directory = load_directory(TEACHER_ROSTER)
+    teachers = directory.teachers
+    search_index = get_search_index(directory.sha256)
+
+
+st.title("VIT Chennai Teacher Review")
+st.header("Search for a Teacher")
+
+search_query = st.text_input("Search for a teacher:")
+
+if search_query:
+    # Ranked, typo-tolerant and word-order independent; capped at MAX_SEARCH_RESULTS
+    with perf_timer.stage("search"):
+        matches = search_index.search(clean_name(search_query), limit=MAX_SEARCH_RESULTS)
+else:
+    matches = []
+
+RESULTS_PAGE_SIZES = [5, 10, 25]
+
+
+def own_pending_reviews(teacher_key):
+    # Reviews this session submitted that the snapshot does not have yet (it is
+    # rebuilt in the background); dropped from session state once it does
+    max_id = (review_snapshot.version or (0, None))[1] or 0
+    pending = [item for item in st.session_state.get("pending_reviews", []) if item[1] > max_id]
+    st.session_state["pending_reviews"] = pending
+    return [record for key, _, record in pending if key == teacher_key]
+
+
+def render_teacher_summary(teacher_id, teacher, teacher_summary):
+    # One compact row per match; returns whether the teacher is expanded
+    col1, col2, col3 = st.columns([3, 2, 1])
+    col1.markdown(f"**{teacher}**")
+    if teacher_summary:
+        avg_overall_rating = min(teacher_summary["means"]["overall"], 10)
+        col2.write(f"{avg_overall_rating:.2f} / 10 ({teacher_summary['count']} reviews)")
+    else:
+        col2.write("No reviews yet")
+    opened = col3.toggle("Details", key=f"details_{teacher_id}")
+    return opened
+
+
+def render_teacher_details(teacher_id, teacher, image_url, teacher_summary):
+    # Reviews, rating form and photo; only built for expanded teachers
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.subheader(f"Teacher: {teacher}")
+
+        pending = own_pending_reviews(directory.cleaned[teacher_id])
+        if pending:
+            st.caption("Your review is saved and will be counted in the ratings shortly.")
+            for review in pending:
+                st.write(f"- **Teaching**: {review['Teaching ']} | **Leniency**: {review['Leniency ']} | "
+                         f"**Correction**: {review['Correction ']} | **DA/Quiz**: {review['DA/Quiz ']} | "
+                         f"**Comment**: {review[COMMENT_COLUMN] or '-'} (yours)")
+
+        if teacher_summary:
+            reviews = review_snapshot.latest_reviews(directory.cleaned[teacher_id])
+            st.write("### Reviews:")
+            if teacher_summary["count"] > len(reviews):
+                st.caption(f"Showing the latest {len(reviews)} of {teacher_summary['count']} reviews.")
+
+            for review in reviews:
+                comment = review.get('Comment', '-')
+                comment_display = f"*{comment}*" if comment != '-' else '-'
+                st.write(f"- **Teaching**: {review.get('Teaching ', 'N/A')} | **Leniency**: {review.get('Leniency ', 'N/A')} | "
+                         f"**Correction**: {review.get('Correction ', 'N/A')} | **DA/Quiz**: {review.get('DA/Quiz ', 'N/A')} | "
+                         f"**Comment**: {comment_display}")
+
+            avg_overall_rating = min(teacher_summary["means"]["overall"], 10)
+            num_reviews = teacher_summary["count"]
+            st.write(f"### Overall Rating: {avg_overall_rating:.2f} / 10 ({num_reviews} reviews)")
+            st.bar_chart({"Reviews": review_snapshot.histogram(directory.cleaned[teacher_id])}, height=160)
+        else:
+            st.write("No reviews submitted yet for this teacher.")
+
+        st.markdown("### **Rate the Teacher**")
+        teaching = st.slider("Teaching", 0, 10, key=f"teaching_{teacher_id}")
+        leniency = st.slider("Leniency", 0, 10, key=f"leniency_{teacher_id}")
+        correction = st.slider("Correction", 0, 10, key=f"correction_{teacher_id}")
+        da_quiz = st.slider("DA/Quiz", 0, 10, key=f"da_quiz_{teacher_id}")
+
+        overall_rating_input = calculate_overall_rating([teaching, leniency, correction, da_quiz])
+        st.write(f"**Overall Rating**: {overall_rating_input:.2f} / 10")
+
+        # Comment section with live character count
+        max_comment_length = 100
+        comment = st.text_area(
+            "Leave a comment (optional, max 100 characters):",
+            key=f"comment_{teacher_id}",
+            max_chars=max_comment_length,
+            placeholder="Type your comment here..."
+        )
+        comment_length = len(comment)
+        st.write(f"{comment_length}/{max_comment_length} characters")
+
+        with col2:
+            try:
+                # Falls back to the remote URL if the photo could not be cached
+                thumbnail = get_thumbnail_cache().get(image_url)
+                st.image(thumbnail or image_url, caption=f"{teacher}", width=150)
+            except Exception as e:
+                st.error(f"Error displaying image: {e}")
+
+        submit_button = st.button(f"Submit Review for {teacher}", key=f"submit_{teacher_id}")
+
+        if submit_button:
+            if teacher not in st.session_state.get('submitted_reviews', []):
+                data_to_insert = [teacher, teaching, leniency, correction, da_quiz, overall_rating_input, comment]
+
+                allowed, reason = get_submission_guard().check(client_fingerprint(), directory.cleaned[teacher_id], comment,
+                                                               network_id=client_network())
+                if not allowed:
+                    st.warning(reason)
+                else:
+                    try:
+                        review_id = submit_review(data_to_insert)
+                        st.success(f"Review for {teacher} submitted successfully!")
+                        if review_id is not None:
+                            record = dict(zip([TEACHER_COLUMN, *(column for _, column in RATING_COLUMNS), COMMENT_COLUMN],
+                                              data_to_insert))
+                            st.session_state.setdefault("pending_reviews", []).append(
+                                (directory.cleaned[teacher_id], review_id, record))
+
+                        if 'submitted_reviews' not in st.session_state:
+                            st.session_state.submitted_reviews = []
+                        st.session_state.submitted_reviews.append(teacher)
+                    except Exception as e:
+                        st.error(f"Failed to submit review: {e}")
+            else:
+                st.warning(f"Review for {teacher} has already been submitted. You can only submit one review per teacher.")
+
+
+if matches:
+    st.write("Teachers found:")
+    if len(matches) == MAX_SEARCH_RESULTS:
+        st.caption(f"Showing the top {MAX_SEARCH_RESULTS} matches. Refine your search to narrow it down.")
+
+    page_col, size_col = st.columns([1, 1])
+    page_size = size_col.selectbox("Results per page", RESULTS_PAGE_SIZES, index=1, key="results_page_size")
+    n_pages = (len(matches) + page_size - 1) // page_size
+    # A new search (or a bigger page size) can leave the stored page out of range
+    if st.session_state.get("results_page", 1) > n_pages or st.session_state.get("results_query") != search_query:
+        st.session_state["results_page"] = 1
+    st.session_state["results_query"] = search_query
+    page = page_col.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, key="results_page")
+
+    shown = matches[(page - 1) * page_size:page * page_size]
+    expanded = 0
+    for teacher_id in shown:
+        with perf_timer.stage("results render"):
+            teacher, image_url = teachers[teacher_id]
+            teacher_summary = review_snapshot.teacher_summary(directory.cleaned[teacher_id])
+            if render_teacher_summary(teacher_id, teacher, teacher_summary):
+                expanded += 1
+                render_teacher_details(teacher_id, teacher, image_url, teacher_summary)
+    # Render cost scales with the rows on the page and the teachers expanded among them
+    perf_timer.count("results", len(matches))
+    perf_timer.count("results shown", len(shown))
+    perf_timer.count("teachers expanded", expanded)
+else:
+    st.write("No teachers found.")
+
+total_reviews = review_snapshot.review_count
+
+st.markdown(
+    f"""
+    <hr style="margin-top: 3rem;">
+    <div style="text-align: center; color: grey; font-size: 2 rem;">
+        Please contribute with reviews & search admin for feedback| <a href="https://forms.gle/YFLkZi3UxRtGyxdA9" target="_blank" style="color: #8f8f8f; text-decoration: none; font-weight: bold;">Contact Me</a>
+    </div>
+    <div style="text-align: center; color: #4CAF50; font-size: 1.5rem; margin-top: 1rem;">
+        Total number of reviews: {total_reviews}
+    </div>
+    """,
+    unsafe_allow_html=True
+)
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import re
+import uuid
+
+import streamlit as st
+
+from perf import track_cache
+from review_snapshot import REVIEW_SNAPSHOT_PATH, ReviewSnapshot, SnapshotBuilder, build_snapshot, read_snapshot_version
+from review_store import SQLiteReviewStore, SheetMirror
+from submission_guard import SubmissionGuard
+
+# Process-wide resources shared by the app's pages. Heavy optional imports
+# (gspread and the Google auth stack, Pillow) happen on first use, so a page
+# only pays for what it touches.
+TEACHER_ROSTER = os.environ.get("TEACHER_ROSTER", "vitc.txt")
+
+
+# Only ever called on the mirror thread. Failures raise (cache_resource does not
+# cache exceptions), so the mirror backs off and retries instead of holding None.
+@track_cache(st.cache_resource)
+def get_google_sheet():
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    credentials = Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"],
+        scopes=["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+    )
+    client = gspread.authorize(credentials)
+    return client.open_by_key("1JAAE6abFQ1T-SsO_FJTygDsM85kjvPrAC9l15PvcEwU").sheet1
+
+
+def reviews_offline():
+    # REVIEWS_OFFLINE=1 (or no service account configured) keeps everything in SQLite
+    if os.environ.get("REVIEWS_OFFLINE") == "1":
+        return True
+    try:
+        return "gcp_service_account" not in st.secrets
+    except Exception:
+        return True
+
+
+# SQLite is the primary review store; every read is local
+@track_cache(st.cache_resource)
+def get_review_store():
+    return SQLiteReviewStore()
+
+
+# Timetables saved from the planner, queryable by slot, room and faculty
+@track_cache(st.cache_resource)
+def get_timetable_store():
+    from timetable_store import TimetableStore  # pulls in slots; only the planner needs it
+
+    return TimetableStore()
+
+
+# Background replication to and from the Google Sheet (None when offline).
+# The sheet (and gspread with it) is first opened on the mirror's own thread.
+@track_cache(st.cache_resource)
+def get_sheet_mirror():
+    if reviews_offline():
+        return None
+    return SheetMirror(get_review_store(), get_google_sheet, on_change=get_snapshot_builder().request)
+
+
+# Rebuilds the review snapshot in the background after local submits and
+# whenever the mirror sees the store change
+@track_cache(st.cache_resource)
+def get_snapshot_builder():
+    return SnapshotBuilder(get_review_store())
+
+
+# Per-teacher summaries for the review pages, mapped read-only by every process
+# on the host. Call .refresh() once per rerun to pick up a rebuilt file. Only a
+# missing snapshot is built in the foreground; a stale one is served while the
+# builder catches up.
+@track_cache(st.cache_resource)
+def get_review_snapshot():
+    if read_snapshot_version(REVIEW_SNAPSHOT_PATH) is None:
+        build_snapshot(get_review_store())
+    else:
+        get_snapshot_builder().request()
+    return ReviewSnapshot()
+
+
+# Downscaled faculty photos on local disk; warm it with `python thumbnails.py prefetch`
+@track_cache(st.cache_resource)
+def get_thumbnail_cache():
+    from thumbnails import ThumbnailCache
+
+    return ThumbnailCache()
+
+
+# Shared by every session in this process, so reloading the page does not reset it
+@track_cache(st.cache_resource)
+def get_submission_guard():
+    return SubmissionGuard()
+
+
+# Comma-separated addresses of our own reverse proxies. X-Forwarded-For is
+# believed only on connections from one of them; anyone else can set it to anything.
+TRUSTED_PROXIES = frozenset(ip.strip() for ip in os.environ.get("TRUSTED_PROXIES", "").split(",") if ip.strip())
+CLIENT_COOKIE = "ffcs_client"
+_CLIENT_TOKEN_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+def client_address(peer_ip, forwarded_for, trusted_proxies=TRUSTED_PROXIES):
+    # The client's IP: the connection's own address, unless that is a trusted
+    # proxy, in which case the right-most forwarded hop that is not one of ours
+    if peer_ip not in trusted_proxies:
+        return peer_ip
+    for hop in reversed([hop.strip() for hop in (forwarded_for or "").split(",")]):
+        if hop and hop not in trusted_proxies:
+            return hop
+    return peer_ip
+
+
+def client_token():
+    # Random per-browser id, kept in a cookie so it survives reloads (and in
+    # session state until the cookie comes back). Unlike the IP it is not
+    # shared by everyone behind the same NAT.
+    token = st.session_state.get("client_token")
+    if token is None:
+        cookies = getattr(getattr(st, "context", None), "cookies", None) or {}
+        token = cookies.get(CLIENT_COOKIE)
+        if not token or not _CLIENT_TOKEN_RE.match(token):
+            token = uuid.uuid4().hex
+            st.html(f"<script>document.cookie = '{CLIENT_COOKIE}={token}; max-age=31536000; path=/; SameSite=Lax';"
+                    f"</script>", unsafe_allow_javascript=True)
+        st.session_state["client_token"] = token
+    return token
+
+
+def client_network():
+    # The client's IP, for limits a new cookie does not reset
+    context = getattr(st, "context", None)
+    headers = getattr(context, "headers", None) or {}
+    return client_address(getattr(context, "ip_address", None), headers.get("X-Forwarded-For"))
+
+
+def client_fingerprint():
+    # Spam-guard client key: client IP + user agent where Streamlit exposes them,
+    # plus client_token(), so students sharing a NAT and a browser build get
+    # buckets of their own. A fresh cookie resets it, so the guard also limits
+    # by client_network().
+    headers = getattr(getattr(st, "context", None), "headers", None) or {}
+    user_agent = headers.get("User-Agent", "")
+    return hashlib.blake2b(f"{client_network()}|{user_agent}|{client_token()}".encode(), digest_size=12).hexdigest()
+
+
+def submit_review(row):
+    # Local first: the review is in SQLite when this returns, however slow or
+    # down the sheet is. The snapshot catches up in the background; until then
+    # the page shows the review from session state. Returns the review's id.
+    review_id = get_review_store().add_review(row)
+    get_snapshot_builder().request()
+    mirror = get_sheet_mirror()
+    if mirror:
+        mirror.wakeup()
+    return review_id
@@ -0,0 +1,75 @@
+# Simulated concurrent sessions hammering SubmissionGuard: checks that no
+# limit is exceeded under contention, that memory stays bounded, and reports
+# check() throughput.  Run from the repo root:
+#   python benchmarks/guard_bench.py
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from submission_guard import SubmissionGuard, comment_hash
+
+TEACHERS = [f"teacher {i}" for i in range(50)]
+COMMENTS = ["Great teacher!", "great  teacher", "GREAAAT teacher :)", "strict but fair", "", "avoid", "Avoid!!!"]
+
+
+def session(guard, client_id, n_submissions, seed, accepted, lock, start):
+    rng = random.Random(seed)
+    start.wait()
+    for _ in range(n_submissions):
+        teacher = rng.choice(TEACHERS)
+        comment = rng.choice(COMMENTS) if rng.random() < 0.7 else f"comment {rng.random()}"
+        ok, _ = guard.check(client_id, teacher, comment)
+        if ok:
+            with lock:
+                accepted.append((client_id, teacher, comment))
+
+
+def run(n_clients, n_threads_per_client, n_submissions, **limits):
+    guard = SubmissionGuard(**limits)
+    accepted = []
+    lock = threading.Lock()
+    start = threading.Event()
+    threads = [
+        threading.Thread(target=session, args=(guard, f"client {c}", n_submissions, c * 1000 + t, accepted, lock, start))
+        for c in range(n_clients) for t in range(n_threads_per_client)
+    ]
+    for thread in threads:
+        thread.start()
+    began = time.perf_counter()
+    start.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    per_pair = Counter((client, teacher) for client, teacher, _ in accepted)
+    per_client = Counter(client for client, _, _ in accepted)
+    per_comment = Counter((teacher, comment_hash(comment)) for _, teacher, comment in accepted if comment_hash(comment))
+    max_keys = limits.get("max_keys")
+    if max_keys:
+        # Evicted keys come back with a full bucket; only the memory bound holds
+        assert max(len(guard.per_teacher), len(guard.per_client), len(guard.comments)) <= max_keys, "tables not bounded"
+    else:
+        assert max(per_pair.values(), default=0) <= 1, "client reviewed a teacher twice"
+        assert max(per_client.values(), default=0) <= limits.get("client_burst", 5), "client burst exceeded"
+        assert max(per_comment.values(), default=0) <= 1, "duplicate comment accepted"
+    assert len(accepted) <= limits.get("global_burst", 60), "global burst exceeded"
+    total = len(threads) * n_submissions
+    print(f"{n_clients:>6} clients x {n_threads_per_client} sessions: {total:>7} submissions, {len(accepted):>4} accepted, "
+          f"{guard.rejected:>7} rejected, {total / elapsed:>9.0f} checks/s, "
+          f"{len(guard.per_teacher)} pair buckets, {len(guard.per_client)} client buckets")
+
+
+def main():
+    run(10, 4, 500)
+    run(200, 2, 100, global_burst=1000)
+    # Far more clients than max_keys: tables must stay bounded
+    run(2000, 1, 20, global_burst=100_000, max_keys=500)
+
+
+if __name__ == "__main__":
+    main()
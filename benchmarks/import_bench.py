@@ -0,0 +1,48 @@
+# Bulk timetable import: parse + validate a pasted VTOP table of a few hundred
+# rows (lots of mutual clashes), on top of a half-full timetable.  Run from the repo root:
+#   python benchmarks/import_bench.py [n_rows]
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slots import slot_is_lab, slot_to_cells
+from timetable_import import parse_import, plan_import
+
+THEORY_SLOTS = [slot for slot in slot_to_cells if not slot_is_lab[slot]]
+LAB_PAIRS = [f"L{i}+L{i + 1}" for i in range(1, 60, 2)]
+
+
+def vtop_text(n_rows, rng):
+    lines = []
+    for i in range(n_rows):
+        slots = rng.choice(LAB_PAIRS) if rng.random() < 0.3 else "+".join(rng.sample(THEORY_SLOTS, rng.randint(1, 2)))
+        lines.append(f"{i + 1}\tGeneral (Semester)\tBCSE{100 + i}L - Course {i} - Embedded Theory\t3 0 0 0 3\t"
+                     f"Program Core\tRegular\tCH20242501{i:05d}\t{slots} - AB1-{100 + i}\tFACULTY {i} - SCOPE")
+    return "\n".join(lines)
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    rng = random.Random(0)
+    text = vtop_text(n_rows, rng)
+    existing = [entry for _, entry in parse_import(vtop_text(8, random.Random(1)))]
+    timings = {"parse": [], "validate + apply": []}
+    for _ in range(10):
+        start = time.perf_counter()
+        rows = parse_import(text)
+        timings["parse"].append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        _, faculty_list, problems = plan_import([entry for _, entry in rows], existing)
+        timings["validate + apply"].append((time.perf_counter() - start) * 1000)
+    print(f"{n_rows} rows: {len(rows)} parsed, {len(faculty_list) - len(existing)} imported, "
+          f"{sum(1 for found in problems if found)} rejected, {sum(len(found) for found in problems)} problems reported")
+    for label, values in timings.items():
+        print(f"{label:<18} median {statistics.median(values):7.1f} ms  max {max(values):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# Load test: many simulated students driving streamlit_app.py at once through
+# Streamlit's AppTest harness, against a synthetic roster, a synthetic review
+# set and a fake gspread worksheet. Each session searches, opens a teacher's
+# reviews, submits a rating, then opens the planner and adds a course. Reports p50/p95
+# rerun latency per step, memory per live session and Google Sheet calls.
+#
+# AppTest swaps a global Runtime in and out around every run, so reruns cannot
+# overlap inside one process. Concurrency therefore comes from --processes
+# worker processes (think: app replicas, each with its own copy of the review
+# database and its own sheet mirror), each keeping --sessions / --processes
+# sessions alive and stepping them round-robin.
+# Run from the repo root:
+#   python benchmarks/load_test.py --sessions 200 --processes 8 --teachers 3000 --reviews 50000
+import argparse
+import os
+import random
+import multiprocessing
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+sys.path.insert(0, os.path.join(REPO, "benchmarks"))
+APP = os.path.join(REPO, "streamlit_app.py")
+
+from search_bench import synthetic_roster
+from tests.fakes import FakeWorksheet
+
+
+def install_fake_sheet(sheet):
+    # get_google_sheet() goes through Credentials and gspread.authorize
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    class FakeSpreadsheet:
+        sheet1 = sheet
+
+    class FakeClient:
+        def open_by_key(self, key):
+            return FakeSpreadsheet()
+
+    Credentials.from_service_account_info = staticmethod(lambda info, scopes=None: object())
+    gspread.authorize = lambda credentials: FakeClient()
+
+
+def write_roster(path, n_teachers, image_url):
+    names = synthetic_roster(n_teachers)
+    with open(path, "w") as f:
+        for name in names:
+            f.write(f"Name: {name}\nImage: {image_url}\n\n")
+    return names
+
+
+def write_image(path):
+    from PIL import Image
+
+    Image.new("RGB", (300, 400), (90, 120, 160)).save(path, format="JPEG")
+
+
+def seed_reviews(db_path, names, n_reviews, seed):
+    # The same rows go into the store and every replica's fake sheet, as if
+    # pulled from it, so the mirrors' startup reconcile finds them in agreement
+    from review_store import SHEET_HEADER, SQLiteReviewStore
+
+    rng = random.Random(seed)
+    store = SQLiteReviewStore(db_path)
+    rows = []
+    for _ in range(n_reviews):
+        name = names[min(int(rng.paretovariate(1.1)) - 1, len(names) - 1)]
+        ratings = [rng.randint(0, 10) for _ in range(4)]
+        rows.append([name, *ratings, sum(ratings) / 4, rng.choice(["", "good", "strict", "ok"])])
+    store.import_sheet_rows(2, SHEET_HEADER, rows)
+    return store, rows
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current RSS, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))] if values else float("nan")
+
+
+STEPS = ["load", "search", "view reviews", "submit rating", "open planner", "add slots"]
+
+
+class Session:
+    # One student: load, search, open a teacher, rate them, plan a course
+    COURSES = ["A1+TA1", "B1+TB1", "C1+TC1", "D1+TD1", "E1+TE1", "F1+TF1", "G1+TG1", "L1+L2", "L31+L32"]
+
+    def __init__(self, seed, names, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = random.Random(seed)
+        self.names = names
+        self.query = self.rng.choice(self.rng.choice(names).split()[1:])
+        self.timings = {}
+        self.errors = []
+        self.app = AppTest.from_file(APP, default_timeout=timeout)
+        self.app.secrets["gcp_service_account"] = {"type": "service_account"}
+
+    def step(self, name):
+        if self.errors:
+            return
+        action = {
+            "load": lambda: self.app.run(),
+            "search": lambda: self.app.text_input[0].input(self.query).run(),
+            "view reviews": lambda: self.app.toggle[0].set_value(True).run(),
+            "submit rating": self.submit_rating,
+            "open planner": lambda: self.app.switch_page("app_pages/planner.py").run(),
+            "add slots": self.add_slots,
+        }[name]
+        start = time.perf_counter()
+        try:
+            action()
+        except Exception as e:
+            self.errors.append(f"{name}: {e!r}")
+            return
+        self.timings[name] = (time.perf_counter() - start) * 1000
+        if self.app.exception:
+            self.errors.append(f"{name}: {self.app.exception[0].value}")
+
+    def submit_rating(self):
+        at = self.app
+        for slider in at.slider:
+            if slider.key and slider.key.split("_")[0] in ("teaching", "leniency", "correction", "da"):
+                slider.set_value(self.rng.randint(0, 10))
+        at.text_area[0].input(self.rng.choice(["", "great", "fair", f"note {self.rng.random():.6f}"]))
+        next(button for button in at.button if button.label.startswith("Submit Review")).click().run()
+
+    def add_slots(self):
+        at = self.app
+        at.text_input(key="course_code").input("CSE2001")
+        at.text_input(key="faculty").input(self.rng.choice(self.names))
+        at.text_input(key="slot_str").input(self.rng.choice(self.COURSES))
+        next(button for button in at.button if button.label == "Add to Timetable").click().run()
+
+
+def worker(job):
+    # One app replica: its own working directory, review database and fake sheet
+    worker_id, seeds, workdir, names, sheet_rows, timeout = job
+    replica_dir = os.path.join(workdir, f"replica-{worker_id}")
+    os.makedirs(replica_dir)
+    os.chdir(replica_dir)  # thumbnail and directory caches land here
+    db_path = os.path.join(replica_dir, "reviews.db")
+    shutil.copy(os.path.join(workdir, "reviews.db"), db_path)
+    os.environ["TEACHER_ROSTER"] = os.path.join(workdir, "roster.txt")
+    os.environ["REVIEW_DB_PATH"] = db_path
+    os.environ.pop("REVIEWS_OFFLINE", None)
+
+    from review_store import SHEET_HEADER, SQLiteReviewStore
+
+    sheet = FakeWorksheet(SHEET_HEADER, sheet_rows)
+    install_fake_sheet(sheet)
+    store = SQLiteReviewStore(db_path)
+
+    # Warm the process-wide caches once so memory per session excludes them
+    warm = Session(-1 - worker_id, names, timeout)
+    for step in STEPS:
+        warm.step(step)
+    baseline = rss_bytes()
+
+    sessions = [Session(seed, names, timeout) for seed in seeds]
+    for step in STEPS:
+        for session in sessions:
+            session.step(step)
+    per_session = (rss_bytes() - baseline) / max(1, len(sessions))
+
+    # Give the background mirror a moment to push the new reviews
+    deadline = time.monotonic() + 30
+    while store.pending_count() and time.monotonic() < deadline:
+        time.sleep(0.5)
+    return {
+        "timings": {step: [session.timings[step] for session in sessions if step in session.timings] for step in STEPS},
+        "errors": warm.errors + [error for session in sessions for error in session.errors],
+        "per_session": per_session,
+        "rss": rss_bytes(),
+        "submitted": store.count(),
+        "pending": store.pending_count(),
+        "sheet_rows": len(sheet.rows) - 1 - len(sheet_rows),
+        "sheet_calls": dict(sheet.calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--teachers", type=int, default=2000)
+    parser.add_argument("--reviews", type=int, default=20000)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ffcs-load-")
+    image_path = os.path.join(workdir, "teacher.jpg")
+    write_image(image_path)
+    names = write_roster(os.path.join(workdir, "roster.txt"), args.teachers, f"file://{image_path}")
+    store, sheet_rows = seed_reviews(os.path.join(workdir, "reviews.db"), names, args.reviews, args.seed)
+    # Fold the WAL back into reviews.db so the replicas' copies include the seed
+    store._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    print(f"{args.teachers} teachers, {args.reviews} reviews, {args.sessions} sessions over {args.processes} processes "
+          f"(workdir {workdir})")
+
+    jobs = [
+        (i, list(range(i, args.sessions, args.processes)), workdir, names, sheet_rows, args.timeout)
+        for i in range(args.processes)
+    ]
+    start = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+        results = pool.map(worker, jobs)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'step':<16}{'runs':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for step in STEPS:
+        timings = [ms for result in results for ms in result["timings"][step]]
+        print(f"{step:<16}{len(timings):>6}{percentile(timings, 0.5):>10.1f}{percentile(timings, 0.95):>10.1f}"
+              f"{max(timings, default=float('nan')):>10.1f}")
+    errors = [error for result in results for error in result["errors"]]
+    print(f"\n{args.sessions} sessions in {elapsed:.1f} s, {len(errors)} failed")
+    for error in errors[:5]:
+        print(f"  {error}")
+    per_session = sum(result["per_session"] for result in results) / len(results)
+    print(f"memory per live session: {per_session / 1024:.0f} KiB "
+          f"(RSS per replica {max(result['rss'] for result in results) / 2 ** 20:.0f} MiB max)")
+    submitted = sum(result["submitted"] for result in results) - args.processes * args.reviews
+    print(f"new reviews: {submitted}, {sum(result['pending'] for result in results)} not yet in the sheet, "
+          f"{sum(result['sheet_rows'] for result in results)} rows appended")
+    calls = Counter()
+    for result in results:
+        calls.update(result["sheet_calls"])
+    print(f"sheet calls: {dict(calls)} ({sum(calls.values())} total)")
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
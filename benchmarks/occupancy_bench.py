@@ -0,0 +1,77 @@
+# Shared timetable store: save tens of thousands of synthetic timetables, then
+# time the planner's lookups (faculty teaching a course in a slot, free rooms in
+# a slot on a day, students per faculty). Run from the repo root:
+#   python benchmarks/occupancy_bench.py [n_timetables]
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slots import slot_is_lab, slot_mask, slot_to_cells
+from timetable_store import TimetableStore
+
+THEORY_SLOTS = [slot for slot in slot_to_cells if not slot_is_lab[slot]]
+LAB_PAIRS = [f"L{i}+L{i + 1}" for i in range(1, 60, 2)]
+COURSES = [f"BCSE{100 + i}L" for i in range(120)]
+FACULTY = [f"FACULTY {i}" for i in range(400)]
+ROOMS = [f"AB{block}-{floor}{room:02d}" for block in (1, 2, 3) for floor in range(1, 7) for room in range(1, 21)]
+
+
+def random_timetable(rng, n_courses=7):
+    entries = []
+    taken = 0
+    for course in rng.sample(COURSES, n_courses):
+        for _ in range(10):
+            slots = rng.choice(LAB_PAIRS) if rng.random() < 0.25 else "+".join(rng.sample(THEORY_SLOTS, 2))
+            mask = 0
+            for slot in slots.split("+"):
+                mask |= slot_mask[slot]
+            if not mask & taken:
+                taken |= mask
+                entries.append({"course_code": course, "course_name": "", "faculty": rng.choice(FACULTY),
+                                "slots": slots, "room": rng.choice(ROOMS)})
+                break
+    return entries
+
+
+def timed(values, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    values.append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def main():
+    n_timetables = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as workdir:
+        store = TimetableStore(os.path.join(workdir, "timetables.db"))
+        start = time.perf_counter()
+        for i in range(n_timetables):
+            store.save(f"student-{i}", random_timetable(rng))
+        elapsed = time.perf_counter() - start
+        print(f"saved {n_timetables} timetables in {elapsed:.1f} s ({elapsed / n_timetables * 1000:.2f} ms each), "
+              f"db {os.path.getsize(store.path) / 1e6:.1f} MB + WAL")
+
+        timings = {"faculty for course in slot": [], "free rooms in slot on day": [],
+                   "students per faculty": [], "re-save one timetable": []}
+        for _ in range(200):
+            slot = rng.choice(THEORY_SLOTS)
+            day = rng.choice(sorted({day for day, _ in slot_to_cells[slot]}))
+            timed(timings["faculty for course in slot"], store.faculty_for, rng.choice(COURSES), slot)
+            timed(timings["free rooms in slot on day"], store.free_rooms, slot, day)
+            timed(timings["students per faculty"], store.faculty_students, rng.choice(FACULTY))
+            timed(timings["re-save one timetable"], store.save, f"student-{rng.randrange(n_timetables)}",
+                  random_timetable(rng))
+        for label, values in timings.items():
+            values.sort()
+            print(f"{label:<28} median {statistics.median(values):7.2f} ms  "
+                  f"p95 {values[int(len(values) * 0.95)]:7.2f} ms  max {values[-1]:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
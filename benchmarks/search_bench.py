@@ -0,0 +1,70 @@
+# Micro-benchmark: linear substring scan (old search) vs TeacherSearchIndex
+# on a synthetic roster.  Run from the repo root:
+#   python benchmarks/search_bench.py [n_names]
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reviews import clean_name
+from teacher_search import TeacherSearchIndex, tokenize
+
+SYLLABLES = ["ra", "ja", "ku", "ma", "an", "ees", "wa", "ri", "pr", "ya", "sh", "la", "vi", "nd", "th", "ga", "na", "ba", "su", "ke"]
+
+
+def synthetic_roster(n, seed=0):
+    rng = random.Random(seed)
+    names = []
+    for _ in range(n):
+        words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title() for _ in range(rng.randint(1, 3))]
+        initials = " ".join(rng.choice("ABCDEFGHJKLMNPRSTV") for _ in range(rng.randint(0, 2)))
+        names.append(f"Dr. {' '.join(words)} {initials}".strip())
+    return names
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def time_queries(search, queries, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            search(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    names = synthetic_roster(n)
+    cleaned = [clean_name(name) for name in names]
+    rng = random.Random(1)
+    queries = [rng.choice(tokenize(rng.choice(names))) for _ in range(50)]
+    queries += [q[:-1] for q in queries[:20]]  # truncated / typo-ish
+    queries += ["a", "ra", "ku ma", "zzz"]
+
+    def linear(query):
+        q = clean_name(query)
+        return [i for i in range(len(cleaned)) if q in cleaned[i]]
+
+    start = time.perf_counter()
+    index = TeacherSearchIndex(cleaned)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    linear_ms = time_queries(linear, queries)
+    index_ms = time_queries(lambda q: index.search(q, limit=25), queries)
+
+    print(f"roster: {n} names, {len(queries)} queries")
+    print(f"index build: {build_ms:.1f} ms")
+    for label, timings in (("linear scan", linear_ms), ("search index", index_ms)):
+        print(f"{label:>12}: median {statistics.median(timings):.2f} ms  p95 {percentile(timings, 0.95):.2f} ms  max {max(timings):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
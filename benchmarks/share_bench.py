@@ -0,0 +1,69 @@
+# Share links: token size against base64'd JSON, and the cost of restoring a
+# timetable from a link (cold decode, memoized decode) against rebuilding it
+# with the bulk import's full clash checks. Run from the repo root:
+#   python benchmarks/share_bench.py [n_links]
+import base64
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slots import slot_is_lab, slot_mask, slot_to_cells
+from timetable_import import plan_import
+from timetable_share import decode_share, encode_timetable, load_shared
+
+THEORY_SLOTS = [slot for slot in slot_to_cells if not slot_is_lab[slot] and not slot.startswith("T")]
+LAB_PAIRS = [f"L{i}+L{i + 1}" for i in range(1, 60, 2)]
+
+
+def random_faculty_list(rng, n_courses=8):
+    entries = []
+    taken = 0
+    for i in range(n_courses):
+        for _ in range(20):
+            slots = rng.choice(LAB_PAIRS) if rng.random() < 0.3 else rng.choice(THEORY_SLOTS)
+            if "+" not in slots and f"T{slots}" in slot_mask:
+                slots += f"+T{slots}"
+            mask = 0
+            for slot in slots.split("+"):
+                mask |= slot_mask[slot]
+            if not mask & taken:
+                taken |= mask
+                entries.append({"course_code": f"BCSE{300 + i}L", "course_name": f"Course Title Number {i}",
+                                "faculty": f"FACULTY {rng.randrange(12)}", "slots": slots,
+                                "room": f"AB1-{rng.randrange(300, 310)}"})
+                break
+    return entries
+
+
+def main():
+    n_links = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rng = random.Random(0)
+    lists = [random_faculty_list(rng) for _ in range(n_links)]
+    tokens = [encode_timetable(faculty_list) for faculty_list in lists]
+    json_sizes = [len(base64.urlsafe_b64encode(json.dumps(faculty_list).encode())) for faculty_list in lists]
+    print(f"{n_links} links of {statistics.mean(len(fl) for fl in lists):.1f} courses: token median "
+          f"{statistics.median(map(len, tokens)):.0f} chars, base64 JSON median {statistics.median(json_sizes):.0f} chars")
+
+    timings = {"encode": [], "decode (cold)": [], "decode (memoized)": [], "rebuild via plan_import": []}
+    decode_share.cache_clear()
+    for faculty_list, token in zip(lists, tokens):
+        for label, fn in [("encode", lambda: encode_timetable(faculty_list)),
+                          ("decode (cold)", lambda: load_shared(token)),
+                          ("decode (memoized)", lambda: load_shared(token)),
+                          ("rebuild via plan_import", lambda: plan_import(faculty_list))]:
+            start = time.perf_counter()
+            fn()
+            timings[label].append((time.perf_counter() - start) * 1e6)
+    # Slots above are already in the decoder's order, so every link round-trips exactly
+    assert all(load_shared(token)[1] == faculty_list for faculty_list, token in zip(lists, tokens))
+    for label, values in timings.items():
+        print(f"{label:<26} median {statistics.median(values):8.1f} us  max {max(values):8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Teacher views from the review snapshot against per-request SQLite
+# aggregation: snapshot build time and size for a large store, then the cost of
+# one teacher view (summary + latest reviews) for a popular and a typical
+# teacher, and for several processes reading the same mapped file at once.
+# Run from the repo root:
+#   python benchmarks/snapshot_bench.py [n_reviews] [processes]
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from review_snapshot import ReviewSnapshot, build_snapshot
+from review_store import SQLiteReviewStore
+
+N_TEACHERS = 2000
+POPULAR = "popular teacher"
+
+
+def seed(store, n_reviews, rng):
+    # A tenth of all reviews go to one teacher; the rest are spread evenly
+    rows = []
+    for i in range(n_reviews):
+        name = "Popular Teacher" if i % 10 == 0 else f"Teacher {rng.randrange(N_TEACHERS)}"
+        ratings = [rng.randint(0, 10) for _ in range(4)]
+        rows.append([name, *ratings, sum(ratings) / 4, rng.choice(["", "good", "strict but fair", "explains well"])])
+    store.import_sheet_rows(2, ["Teacher ", "Teaching ", "Leniency ", "Correction ", "DA/Quiz ", "Overall Rating",
+                                "Comment"], rows)
+
+
+def time_views(view, keys, repeat):
+    timings = []
+    for _ in range(repeat):
+        for key in keys:
+            start = time.perf_counter()
+            view(key)
+            timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def read_worker(job):
+    # One server process: map the snapshot and serve views for a few seconds' worth of requests
+    path, keys, n_views = job
+    snapshot = ReviewSnapshot(path)
+    start = time.perf_counter()
+    for i in range(n_views):
+        key = keys[i % len(keys)]
+        snapshot.teacher_summary(key)
+        snapshot.latest_reviews(key)
+    return n_views / (time.perf_counter() - start)
+
+
+def main():
+    n_reviews = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as workdir:
+        store = SQLiteReviewStore(os.path.join(workdir, "reviews.db"))
+        seed(store, n_reviews, rng)
+        path = os.path.join(workdir, "reviews.snapshot")
+        start = time.perf_counter()
+        build_snapshot(store, path)
+        print(f"{n_reviews} reviews: snapshot built in {(time.perf_counter() - start) * 1000:.0f} ms, "
+              f"{os.path.getsize(path) / 1e6:.2f} MB; db {os.path.getsize(store.path) / 1e6:.1f} MB")
+
+        snapshot = ReviewSnapshot(path)
+        typical = [f"teacher {rng.randrange(N_TEACHERS)}" for _ in range(200)]
+        for label, keys in [("popular teacher", [POPULAR]), ("typical teacher", typical)]:
+            store_us = time_views(lambda key: (store.teacher_summary(key), store.teacher_reviews(key)), keys,
+                                  200 // len(keys) or 1)
+            snapshot_us = time_views(lambda key: (snapshot.teacher_summary(key), snapshot.latest_reviews(key)), keys,
+                                     2000 // len(keys) or 1)
+            print(f"{label:<16} view: store {store_us:8.1f} us   snapshot {snapshot_us:8.1f} us")
+        print(f"refresh() with no new snapshot: {time_views(lambda _: snapshot.refresh(), [None], 10000):.1f} us")
+
+        keys = [POPULAR] + typical
+        with multiprocessing.get_context("spawn").Pool(processes) as pool:
+            rates = pool.map(read_worker, [(path, keys, 50000)] * processes)
+        print(f"{processes} processes sharing one mapped snapshot: {sum(rates):,.0f} views/s in total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Worst-case timings for the timetable solver.  Run from the repo root:
+#   python benchmarks/solver_bench.py
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slots import slot_is_lab, slot_to_cells
+from timetable_solver import prepare_option, solve
+
+THEORY_SLOTS = [slot for slot in slot_to_cells if not slot_is_lab[slot]]
+LAB_PAIRS = [f"L{i}+L{i + 1}" for i in range(1, 60, 2)]
+
+
+def random_option(rng):
+    # A theory slot (+ optional tutorial slot) or a lab pair, never self-clashing
+    while True:
+        if rng.random() < 0.3:
+            slots = rng.choice(LAB_PAIRS)
+        else:
+            slots = "+".join(rng.sample(THEORY_SLOTS, rng.randint(1, 2)))
+        if prepare_option(slots) is not None:
+            return slots
+
+
+def random_courses(rng, n_courses, n_options):
+    return [
+        {"course_code": f"C{c}", "options": [{"faculty": f"F{c}_{o}", "slots": random_option(rng)} for o in range(n_options)]}
+        for c in range(n_courses)
+    ]
+
+
+def crowded_courses(n_courses, n_options):
+    # Every course offered in the same few slots: lots of clashes, deep backtracking
+    pool = ["A1+TA1", "B1+TB1", "C1+TC1", "D1+TD1", "E1+TE1", "F1+TF1", "G1+TG1", "A2+TA2", "B2+TB2", "C2+TC2"]
+    return [
+        {"course_code": f"C{c}", "options": [{"faculty": f"F{c}_{o}", "slots": pool[(c + o) % len(pool)]} for o in range(n_options)]}
+        for c in range(n_courses)
+    ]
+
+
+def run(label, make_courses, repeat=20):
+    timings = []
+    found = 0
+    complete = True
+    for i in range(repeat):
+        courses = make_courses(random.Random(i))
+        ratings = {opt["faculty"]: random.Random(opt["faculty"]).uniform(4, 10) for course in courses for opt in course["options"]}
+        start = time.perf_counter()
+        solutions, done = solve(courses, faculty_rating=ratings.get, top_k=5)
+        timings.append((time.perf_counter() - start) * 1000)
+        found += bool(solutions)
+        complete &= done
+    print(f"{label:<34} median {statistics.median(timings):8.1f} ms  max {max(timings):8.1f} ms  "
+          f"solved {found}/{repeat}  exhaustive={complete}")
+
+
+def main():
+    for n_courses, n_options in ((8, 5), (8, 10), (10, 5), (10, 10)):
+        run(f"random {n_courses} courses x {n_options} options", lambda rng: random_courses(rng, n_courses, n_options))
+    run("crowded 10 courses x 10 options", lambda rng: crowded_courses(10, 10), repeat=3)
+
+
+if __name__ == "__main__":
+    main()
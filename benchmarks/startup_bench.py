@@ -0,0 +1,93 @@
+# Cold-start and rerun cost of the app, before and after the split into pages.
+# Every sample is a fresh interpreter: import streamlit (not timed), then time
+# the first run of the script (cold start) and the median of warm reruns.
+# "before" is the single-script streamlit_app.py from just before the split,
+# taken from git history. Run from the repo root:
+#   python benchmarks/startup_bench.py [trials]
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["gspread", "google.oauth2.service_account", "fpdf", "numpy", "PIL", "slots"]
+
+SAMPLE = r'''
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+script, page, query, reruns = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+at = AppTest.from_file(script, default_timeout=120)
+if page:
+    at.switch_page(page)
+start = time.perf_counter()
+at.run()
+cold = time.perf_counter() - start
+if query:
+    at.text_input[0].input(query).run()
+timings = []
+for _ in range(reruns):
+    start = time.perf_counter()
+    at.run()
+    timings.append(time.perf_counter() - start)
+errors = [str(e.value) for e in at.exception]
+print(json.dumps({"cold": cold, "reruns": timings, "modules": [m for m in json.loads(sys.argv[5]) if m in sys.modules],
+                  "errors": errors}))
+'''
+
+
+def baseline_script(workdir):
+    # streamlit_app.py as of the parent of the commit that introduced st.navigation
+    log = subprocess.run(["git", "log", "--format=%H", "-S", "st.navigation", "--", "streamlit_app.py"],
+                         cwd=REPO, capture_output=True, text=True, check=True).stdout.split()
+    if not log:
+        return None
+    source = subprocess.run(["git", "show", f"{log[-1]}^:streamlit_app.py"],
+                            cwd=REPO, capture_output=True, text=True, check=True).stdout
+    path = os.path.join(workdir, "streamlit_app_before.py")
+    with open(path, "w") as f:
+        f.write(source)
+    return path
+
+
+def sample(script, page="", query="", reruns=5, env=None):
+    result = subprocess.run(
+        [sys.executable, "-c", SAMPLE, script, page, query, str(reruns), json.dumps(HEAVY_MODULES)],
+        cwd=REPO, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, REVIEWS_OFFLINE="1", REVIEW_DB_PATH=os.path.join(workdir, "reviews.db"),
+                   TIMETABLE_DB_PATH=os.path.join(workdir, "timetables.db"),
+                   PYTHONPATH=REPO + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        cases = []
+        before = baseline_script(workdir)
+        if before:
+            cases += [
+                ("before: single script", before, "", ""),
+                ("before: single script, searching", before, "", "kumar"),
+            ]
+        app = os.path.join(REPO, "streamlit_app.py")
+        cases += [
+            ("after: reviews page", app, "", ""),
+            ("after: reviews page, searching", app, "", "kumar"),
+            ("after: planner page", app, "app_pages/planner.py", ""),
+            ("after: leaderboard page", app, "app_pages/leaderboard.py", ""),
+        ]
+        print(f"{'case':<36}{'cold ms':>10}{'rerun ms':>10}  heavy modules loaded")
+        for label, script, page, query in cases:
+            samples = [sample(script, page, query, env=env) for _ in range(trials)]
+            errors = [error for s in samples for error in s["errors"]]
+            cold = statistics.median(s["cold"] for s in samples) * 1000
+            rerun = statistics.median(t for s in samples for t in s["reruns"]) * 1000
+            print(f"{label:<36}{cold:>10.1f}{rerun:>10.1f}  {', '.join(samples[0]['modules']) or '-'}"
+                  + (f"  ERRORS: {errors[0]}" if errors else ""))
+
+
+if __name__ == "__main__":
+    main()
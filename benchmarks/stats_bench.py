@@ -0,0 +1,89 @@
+# Per-teacher rating statistics over a large synthetic review set: the old
+# per-teacher Python loop vs the vectorized ReviewStats pass.  Run from the repo root:
+#   python benchmarks/stats_bench.py [n_reviews]
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from review_stats import ReviewStats
+from review_store import SQLiteReviewStore
+from reviews import RATING_COLUMNS, TEACHER_COLUMN, clean_name, to_number
+
+
+def synthetic_records(n_reviews, n_teachers=1500, seed=0):
+    rng = random.Random(seed)
+    names = [f"Dr. Teacher {i} {rng.choice('ABCDEFGH')}" for i in range(n_teachers)]
+    records = []
+    for _ in range(n_reviews):
+        # Skewed: a few teachers collect most of the reviews
+        record = {TEACHER_COLUMN: names[min(int(rng.paretovariate(1.2)) - 1, n_teachers - 1)]}
+        for _, column in RATING_COLUMNS:
+            record[column] = rng.randint(0, 10)
+        record["Comment"] = ""
+        records.append(record)
+    return records
+
+
+def python_loop(records):
+    # What the render loop used to do, for every teacher at once
+    per_teacher = {}
+    for record in records:
+        lists = per_teacher.setdefault(clean_name(record[TEACHER_COLUMN]), [[] for _ in RATING_COLUMNS])
+        for values, (_, column) in zip(lists, RATING_COLUMNS):
+            values.append(to_number(record[column]))
+    return {
+        key: ([sum(values) / len(values) for values in lists], [statistics.median(values) for values in lists])
+        for key, lists in per_teacher.items()
+    }
+
+
+def timed(label, fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<40} best {min(timings):8.1f} ms")
+    return result
+
+
+def main():
+    n_reviews = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    records = synthetic_records(n_reviews)
+    print(f"{n_reviews} reviews")
+
+    expected = timed("python loop (means + medians)", lambda: python_loop(records))
+    stats = timed("ReviewStats.from_records", lambda: ReviewStats.from_records(records))
+    keys = [clean_name(r[TEACHER_COLUMN]) for r in records]
+    names = [r[TEACHER_COLUMN] for r in records]
+    ratings = np.array([[r[c] for _, c in RATING_COLUMNS] for r in records], dtype=np.float64)
+    timed("ReviewStats on columns (compute only)", lambda: ReviewStats(keys, names, ratings))
+    for key, (means, medians) in expected.items():
+        i = stats.position(key)
+        assert all(abs(a - b) < 1e-9 for a, b in zip(means, stats.means[i])), key
+        assert list(medians) == list(stats.medians[i]), key
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteReviewStore(os.path.join(tmp, "reviews.db"))
+        with store._connect() as db:
+            db.executemany(
+                "INSERT INTO reviews (teacher, teacher_key, teaching, leniency, correction, da_quiz, overall, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                [[r[TEACHER_COLUMN], clean_name(r[TEACHER_COLUMN]), *[r[c] for _, c in RATING_COLUMNS]] for r in records],
+            )
+        timed("ReviewStats.from_store (SQLite)", lambda: ReviewStats.from_store(store))
+        timed("store.records() + python loop", lambda: python_loop(store.records()))
+
+    timed("leaderboard (overall mean, min 5)", lambda: stats.leaderboard(min_reviews=5), repeat=20)
+    print(f"{len(stats)} teachers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import pickle
+import threading
+
+from reviews import clean_name
+
+# Bump when the compiled layout or clean_name changes
+FORMAT_VERSION = 1
+CACHE_DIR = ".cache"
+
+
+class TeacherDirectory:
+    def __init__(self, teachers, cleaned, sha256, mtime, size):
+        self.teachers = teachers  # ((name, image_url), ...)
+        self.cleaned = cleaned  # clean_name(name) for each entry
+        self.sha256 = sha256
+        self.mtime = mtime
+        self.size = size
+
+    def __len__(self):
+        return len(self.teachers)
+
+
+def iter_teachers(path):
+    # Streams the roster, yielding (name, image_url) for every complete Name/Image pair
+    teacher_name = None
+    with open(path, 'r') as f:
+        for line in f:
+            if line.startswith("Name:"):
+                teacher_name = line.strip().replace("Name: ", "")
+            elif line.startswith("Image:"):
+                image_url = line.strip().replace("Image: ", "")
+                if teacher_name and image_url:
+                    yield teacher_name, image_url
+                    teacher_name = None
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compile_directory(path, sha256=None):
+    stat = os.stat(path)
+    teachers = tuple(iter_teachers(path))
+    cleaned = tuple(clean_name(name) for name, _ in teachers)
+    return TeacherDirectory(teachers, cleaned, sha256 or file_sha256(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _cache_path(path, cache_dir):
+    return os.path.join(cache_dir, os.path.basename(path) + ".directory.pickle")
+
+
+def _read_cache(cache_file):
+    try:
+        with open(cache_file, 'rb') as f:
+            version, directory = pickle.load(f)
+        return directory if version == FORMAT_VERSION else None
+    except (OSError, pickle.PickleError, EOFError, ValueError, AttributeError):
+        return None
+
+
+def _write_cache(cache_file, directory):
+    os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+    tmp = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        pickle.dump((FORMAT_VERSION, directory), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, cache_file)
+
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def load_directory(path, cache_dir=CACHE_DIR):
+    # One os.stat per call when nothing changed. A changed mtime/size falls back
+    # to the content hash, so a touched-but-identical file is not re-parsed.
+    stat = os.stat(path)
+    with _lock:
+        directory = _loaded.get(path)
+        if directory is not None and (directory.mtime, directory.size) == (stat.st_mtime_ns, stat.st_size):
+            return directory
+        cache_file = _cache_path(path, cache_dir)
+        if directory is None:
+            directory = _read_cache(cache_file)
+        if directory is not None and (directory.mtime, directory.size) == (stat.st_mtime_ns, stat.st_size):
+            _loaded[path] = directory
+            return directory
+        sha256 = file_sha256(path)
+        if directory is not None and directory.sha256 == sha256:
+            directory.mtime, directory.size = stat.st_mtime_ns, stat.st_size
+        else:
+            directory = compile_directory(path, sha256)
+        try:
+            _write_cache(cache_file, directory)
+        except OSError:
+            pass  # read-only checkout: still fine, just compiled per process
+        _loaded[path] = directory
+        return directory
@@ -0,0 +1,157 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+# Per-rerun stage timings and cache hit/miss counters for the debug panel and
+# an optional JSON-lines log (one line per rerun, set PERF_LOG_PATH to enable).
+# A disabled RerunTimer hands out a shared no-op context, so the hooks can stay
+# in the app permanently. The entry script starts a timer per rerun and pages
+# pick it up with current_timer() (reruns run on their own script thread).
+PERF_LOG_PATH = os.environ.get("PERF_LOG_PATH")
+
+_NULL_STAGE = nullcontext()
+_log_lock = threading.Lock()
+
+# --- Cache counters (process-wide) ---
+_cache_calls = Counter()
+_cache_misses = Counter()
+_external_caches = {}
+
+
+def track_cache(cache, **cache_kwargs):
+    # @track_cache(st.cache_resource, max_entries=2) in place of
+    # @st.cache_resource(max_entries=2): counts calls outside the cache and
+    # executions inside it, so hits = calls - misses
+    def decorate(fn):
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def miss(*args, **kwargs):
+            _cache_misses[name] += 1
+            return fn(*args, **kwargs)
+
+        cached = cache(**cache_kwargs)(miss) if cache_kwargs else cache(miss)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            _cache_calls[name] += 1
+            return cached(*args, **kwargs)
+
+        call.clear = getattr(cached, "clear", None)
+        return call
+    return decorate
+
+
+def register_cache(name, info):
+    # For caches kept elsewhere (functools.lru_cache, the PDF cache): info()
+    # returns an object with hits and misses, like lru_cache's cache_info()
+    _external_caches[name] = info
+
+
+def cache_stats():
+    # name -> (hits, misses), cumulative for this process
+    stats = {name: (_cache_calls[name] - _cache_misses[name], _cache_misses[name]) for name in _cache_calls}
+    for name, info in _external_caches.items():
+        counts = info()
+        stats[name] = (counts.hits, counts.misses)
+    return stats
+
+
+# --- Stage timings (per rerun) ---
+class RerunTimer:
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.stages = {}  # stage -> ms, in the order first seen
+        self.counts = {}  # e.g. "teachers expanded" -> n
+        if enabled:
+            self.started = time.perf_counter()
+            self._caches_at_start = cache_stats()
+
+    def stage(self, name):
+        # with timer.stage("search"): ...  Repeated stages add up.
+        return self._timed(name) if self.enabled else _NULL_STAGE
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def count(self, name, n):
+        if self.enabled:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def cache_deltas(self):
+        # name -> (hits, misses) during this rerun, for caches that were used
+        deltas = {}
+        for name, (hits, misses) in cache_stats().items():
+            hits_before, misses_before = self._caches_at_start.get(name, (0, 0))
+            if hits - hits_before or misses - misses_before:
+                deltas[name] = (hits - hits_before, misses - misses_before)
+        return deltas
+
+    def log(self, path=PERF_LOG_PATH, **fields):
+        if not (self.enabled and path):
+            return
+        line = json.dumps({
+            "ts": time.time(),
+            "total_ms": round(self.total_ms(), 3),
+            "stages": {name: round(ms, 3) for name, ms in self.stages.items()},
+            "caches": {name: {"hits": hits, "misses": misses} for name, (hits, misses) in self.cache_deltas().items()},
+            "counts": self.counts,
+            **fields,
+        })
+        with _log_lock, open(path, "a") as f:
+            f.write(line + "\n")
+
+
+_current = threading.local()
+_DISABLED_TIMER = RerunTimer(False)
+
+
+def start_rerun(enabled):
+    timer = _current.timer = RerunTimer(enabled)
+    return timer
+
+
+def current_timer():
+    return getattr(_current, "timer", _DISABLED_TIMER)
+
+
+def summarize_log(path):
+    # p50 / p95 / max ms per stage over a PERF_LOG_PATH file
+    samples = {}
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            samples.setdefault("total", []).append(record["total_ms"])
+            for name, ms in record["stages"].items():
+                samples.setdefault(name, []).append(ms)
+    summary = {}
+    for name, values in samples.items():
+        values.sort()
+        summary[name] = {
+            "reruns": len(values),
+            "p50": values[len(values) // 2],
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "max": values[-1],
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    # python perf.py summarize perf.jsonl
+    if len(sys.argv) < 3 or sys.argv[1] != "summarize":
+        sys.exit("usage: python perf.py summarize perf.jsonl")
+    for stage, row in summarize_log(sys.argv[2]).items():
+        print(f"{stage:<20} {row['reruns']:>6} reruns  p50 {row['p50']:8.1f} ms  p95 {row['p95']:8.1f} ms  max {row['max']:8.1f} ms")
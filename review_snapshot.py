@@ -0,0 +1,247 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections import deque
+
+from review_store import REVIEW_DB_PATH, _display_number
+from reviews import COMMENT_COLUMN, RATING_COLUMNS, RATING_KEYS, TEACHER_COLUMN
+
+REVIEW_SNAPSHOT_PATH = os.environ.get("REVIEW_SNAPSHOT_PATH", REVIEW_DB_PATH + ".snapshot")
+LATEST_REVIEWS = 20
+HISTOGRAM_BINS = 11  # one bin per whole point, 0-10; same binning as review_stats
+
+# Per-teacher summaries materialized from the review store into one read-only
+# file that every server process maps, so the OS keeps a single copy in the
+# page cache and a teacher view is a binary search plus a few struct reads.
+# All little-endian:
+#   header   magic, format version, n_teachers, store version (count, max id)
+#   index    n_teachers fixed-size records sorted by teacher key (utf-8 bytes):
+#            key, name (offset, length into the strings), review count,
+#            rating sums, rating histograms, latest reviews (offset, count)
+#   strings  teacher keys and names
+#   reviews  latest LATEST_REVIEWS per teacher, oldest first: ratings,
+#            comment length, comment
+_MAGIC = b"REVSNAP\0"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIqq")
+_N_RATINGS = len(RATING_KEYS)
+_RECORD = struct.Struct(f"<IHIHI{_N_RATINGS}d{_N_RATINGS * HISTOGRAM_BINS}IIH")
+_REVIEW = struct.Struct(f"<{_N_RATINGS}dH")
+_RECORD_COLUMNS = (TEACHER_COLUMN, *(column for _, column in RATING_COLUMNS), COMMENT_COLUMN)
+# Builds in one process (script threads after a submit, the mirror thread after
+# a sync) take turns; the later ones then find the snapshot already current
+_build_lock = threading.Lock()
+
+
+def read_snapshot_version(path=REVIEW_SNAPSHOT_PATH):
+    # Store version the snapshot at path was built from, or None
+    try:
+        with open(path, "rb") as f:
+            magic, format_version, n_teachers, count, max_id = _HEADER.unpack(f.read(_HEADER.size))
+            size = os.fstat(f.fileno()).st_size
+    except (OSError, struct.error):
+        return None
+    if magic != _MAGIC or format_version != _FORMAT_VERSION or size < _HEADER.size + n_teachers * _RECORD.size:
+        return None  # not a snapshot, or a truncated one: rebuild it
+    return count, max_id if max_id >= 0 else None
+
+
+def build_snapshot(store, path=REVIEW_SNAPSHOT_PATH, latest=LATEST_REVIEWS, force=False):
+    # Rebuilds the snapshot from store unless it already matches store.version().
+    # Safe to call from several threads and processes at once: every build
+    # writes its own temp file and renames it over path, so readers only ever
+    # see whole snapshots. Returns True if a new snapshot was written.
+    with _build_lock:
+        version = store.version()
+        if not force and read_snapshot_version(path) == version:
+            return False
+        _write_snapshot(store, path, version, latest)
+        return True
+
+
+def _write_snapshot(store, path, version, latest):
+    teachers = []
+    current = None
+    for key, name, *ratings, comment in store.review_rows():
+        if current is None or current[0] != key:
+            current = [key, name, 0, [0.0] * _N_RATINGS, [0] * (_N_RATINGS * HISTOGRAM_BINS), deque(maxlen=latest)]
+            teachers.append(current)
+        current[2] += 1
+        for r, value in enumerate(ratings):
+            current[3][r] += value
+            current[4][r * HISTOGRAM_BINS + min(max(round(value), 0), HISTOGRAM_BINS - 1)] += 1
+        current[5].append((ratings, comment))
+    teachers.sort(key=lambda teacher: teacher[0].encode("utf-8"))
+
+    strings_start = _HEADER.size + _RECORD.size * len(teachers)
+    strings = bytearray()
+    string_positions = []
+    for key, name, *_ in teachers:
+        key_bytes, name_bytes = key.encode("utf-8"), name.encode("utf-8")
+        string_positions.append((strings_start + len(strings), len(key_bytes),
+                                 strings_start + len(strings) + len(key_bytes), len(name_bytes)))
+        strings += key_bytes + name_bytes
+    reviews_start = strings_start + len(strings)
+
+    # A temp file of our own next to path (mkstemp: unique per thread and process),
+    # renamed over path once complete
+    count, max_id = version
+    reviews = bytearray()
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path) + ".")
+    try:
+        os.fchmod(fd, 0o644)
+        with open(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(teachers), count, -1 if max_id is None else max_id))
+            for (_, _, n_reviews, sums, histogram, latest_reviews), positions in zip(teachers, string_positions):
+                f.write(_RECORD.pack(*positions, n_reviews, *sums, *histogram, reviews_start + len(reviews),
+                                     len(latest_reviews)))
+                for ratings, comment in latest_reviews:
+                    comment_bytes = comment.encode("utf-8")[:0xFFFF]
+                    reviews += _REVIEW.pack(*ratings, len(comment_bytes)) + comment_bytes
+            f.write(strings)
+            f.write(reviews)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class SnapshotBuilder:
+    # Rebuilds the snapshot on a thread of its own, so no request waits for a
+    # build (about a second at 100k reviews). request() returns at once; requests
+    # arriving within debounce seconds of each other, or during a build, are
+    # served by a single build. start=False leaves the thread unstarted.
+    def __init__(self, store, path=REVIEW_SNAPSHOT_PATH, debounce=0.5, start=True):
+        self.store = store
+        self.path = path
+        self.debounce = debounce
+        self.builds = 0
+        self.last_error = None
+        self._requested = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="snapshot-builder", daemon=True)
+        if start:
+            self._thread.start()
+
+    def request(self):
+        self._requested.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._requested.wait()
+            if self._stopped.wait(self.debounce):
+                break
+            self._requested.clear()
+            try:
+                if build_snapshot(self.store, self.path):
+                    self.builds += 1
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+
+    def close(self):
+        self._stopped.set()
+        self._requested.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=5)
+
+
+class ReviewSnapshot:
+    # Read side of the snapshot. refresh() (once per rerun) picks up a newly
+    # built file; lookups in between are lock-free reads of the current map.
+    def __init__(self, path=REVIEW_SNAPSHOT_PATH):
+        self.path = path
+        self._identity = None
+        self._map = None
+        self.n_teachers = 0
+        self.review_count = 0
+        self.version = None
+        self.refresh()
+
+    def refresh(self):
+        # Remaps if the file was replaced since the last call; returns True if it was
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity == self._identity:
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # gone again, or empty
+            return False
+        try:
+            magic, format_version, n_teachers, count, max_id = _HEADER.unpack_from(data)
+        except struct.error:
+            magic = None
+        if magic != _MAGIC or format_version != _FORMAT_VERSION or len(data) < _HEADER.size + n_teachers * _RECORD.size:
+            # Not a snapshot we can read; keep serving the current one
+            data.close()
+            return False
+        # Readers on other threads may still hold the old map; it is unmapped once they drop it
+        self._map, self._identity = data, identity
+        self.n_teachers, self.review_count = n_teachers, count
+        self.version = (count, max_id if max_id >= 0 else None)
+        return True
+
+    def _record(self, teacher_key):
+        data = self._map
+        if data is None:
+            return None, None
+        target = teacher_key.encode("utf-8")
+        low, high = 0, self.n_teachers
+        while low < high:
+            middle = (low + high) // 2
+            offset = _HEADER.size + middle * _RECORD.size
+            key_offset, key_len = struct.unpack_from("<IH", data, offset)
+            key = data[key_offset:key_offset + key_len]
+            if key == target:
+                return data, _RECORD.unpack_from(data, offset)
+            if key < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None, None
+
+    def teacher_summary(self, teacher_key):
+        # Same shape as SQLiteReviewStore.teacher_summary: {"count", "sums", "means"}, or None
+        _, record = self._record(teacher_key)
+        if record is None:
+            return None
+        count = record[4]
+        sums = record[5:5 + _N_RATINGS]
+        return {
+            "count": count,
+            "sums": dict(zip(RATING_KEYS, sums)),
+            "means": {key: total / count for key, total in zip(RATING_KEYS, sums)},
+        }
+
+    def histogram(self, teacher_key, rating="overall"):
+        # Reviews scoring 0, 1, ..., 10 on rating
+        _, record = self._record(teacher_key)
+        if record is None:
+            return [0] * HISTOGRAM_BINS
+        start = 5 + _N_RATINGS + RATING_KEYS.index(rating) * HISTOGRAM_BINS
+        return list(record[start:start + HISTOGRAM_BINS])
+
+    def latest_reviews(self, teacher_key):
+        # Up to LATEST_REVIEWS records, oldest first, in the store's record dict shape
+        data, record = self._record(teacher_key)
+        if record is None:
+            return []
+        name = data[record[2]:record[2] + record[3]].decode("utf-8")
+        offset, n_reviews = record[-2:]
+        reviews = []
+        for _ in range(n_reviews):
+            *ratings, comment_len = _REVIEW.unpack_from(data, offset)
+            offset += _REVIEW.size
+            comment = data[offset:offset + comment_len].decode("utf-8", "replace")
+            offset += comment_len
+            reviews.append(dict(zip(_RECORD_COLUMNS, (name, *map(_display_number, ratings), comment))))
+        return reviews
@@ -0,0 +1,102 @@
+import numpy as np
+
+from reviews import RATING_COLUMNS, RATING_KEYS, TEACHER_COLUMN, clean_name, to_number
+
+# Overall/Teaching/... ratings are 0-10; histograms use one bin per whole point
+HISTOGRAM_BINS = 11
+
+
+class ReviewStats:
+    # Per-teacher statistics for every teacher at once, computed from columnar
+    # arrays in a single vectorized pass:
+    #   keys[t], names[t]            cleaned and display name of teacher t
+    #   counts[t]                    number of reviews
+    #   means[t, r], medians[t, r]   per rating column r (RATING_KEYS order)
+    #   histograms[t, r, b]          reviews of teacher t scoring b on rating r
+    def __init__(self, teacher_keys, teacher_names, ratings):
+        # Factorize with a dict: much cheaper than np.unique on an object array of strings
+        position = {}
+        codes = np.array([position.setdefault(key, len(position)) for key in teacher_keys], dtype=np.int64)
+        ratings = np.asarray(ratings, dtype=np.float64).reshape(len(codes), len(RATING_KEYS))
+        self._position = position
+        self.keys = np.asarray(list(position), dtype=object)
+        _, first_index = np.unique(codes, return_index=True)
+        self.names = np.asarray(teacher_names, dtype=object)[first_index]
+        n_teachers = len(self.keys)
+        n_ratings = len(RATING_KEYS)
+
+        self.counts = np.bincount(codes, minlength=n_teachers)
+        sums = np.stack([np.bincount(codes, weights=ratings[:, r], minlength=n_teachers) for r in range(n_ratings)], axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.means = sums / self.counts[:, None]
+
+        # Medians: sort each column within its teacher group, then read the middle element(s).
+        # Offsetting each value by its group code times the column's span turns the
+        # grouped sort into one plain np.sort (several times faster than lexsort).
+        starts = np.concatenate(([0], np.cumsum(self.counts)[:-1]))
+        lower = starts + (self.counts - 1) // 2
+        upper = starts + self.counts // 2
+        self.medians = np.full((n_teachers, n_ratings), np.nan)
+        if len(codes):
+            low = ratings.min(axis=0)
+            span = ratings.max(axis=0) - low + 1
+            sorted_codes = np.repeat(np.arange(n_teachers), self.counts)
+            for r in range(n_ratings):
+                ordered = np.sort(codes * span[r] + (ratings[:, r] - low[r])) - sorted_codes * span[r] + low[r]
+                self.medians[:, r] = (ordered[lower] + ordered[upper]) / 2
+
+        bins = np.clip(np.rint(ratings), 0, HISTOGRAM_BINS - 1).astype(np.int64)
+        self.histograms = np.stack([
+            np.bincount(codes * HISTOGRAM_BINS + bins[:, r], minlength=n_teachers * HISTOGRAM_BINS).reshape(n_teachers, HISTOGRAM_BINS)
+            for r in range(n_ratings)
+        ], axis=1)
+
+    @classmethod
+    def from_records(cls, records):
+        # records in sheet.get_all_records() shape
+        names = [str(record.get(TEACHER_COLUMN, '')).strip() for record in records]
+        ratings = [[to_number(record.get(column, 0)) for _, column in RATING_COLUMNS] for record in records]
+        return cls([clean_name(name) for name in names], names, ratings)
+
+    @classmethod
+    def from_store(cls, store):
+        # Straight from the SQLite store's columns, without building record dicts
+        rows = store.rating_rows()
+        if not rows:
+            return cls([], [], np.empty((0, len(RATING_KEYS))))
+        keys, names, *columns = zip(*rows)
+        return cls(keys, names, np.column_stack(columns))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def position(self, teacher_key):
+        return self._position.get(teacher_key)
+
+    def leaderboard(self, rating="overall", statistic="mean", min_reviews=1, top=20, ascending=False):
+        # Row positions of the top teachers, best first. statistic is "mean",
+        # "median" or "count"; teachers under min_reviews are left out.
+        column = RATING_KEYS.index(rating)
+        if statistic == "count":
+            values = self.counts.astype(np.float64)
+        else:
+            values = (self.medians if statistic == "median" else self.means)[:, column]
+        eligible = np.flatnonzero(self.counts >= min_reviews)
+        if not len(eligible):
+            return eligible
+        values = values[eligible]
+        # Ties broken by review count (more reviews first)
+        order = np.lexsort((-self.counts[eligible], values if ascending else -values))
+        return eligible[order[:top]]
+
+    def rows(self, positions):
+        # Table rows for st.dataframe
+        return [
+            {
+                "Teacher": self.names[i],
+                "Reviews": int(self.counts[i]),
+                **{f"{label.strip()} (mean)": round(float(self.means[i, r]), 2) for r, (_, label) in enumerate(RATING_COLUMNS)},
+                "Overall (median)": float(self.medians[i, RATING_KEYS.index("overall")]),
+            }
+            for i in positions
+        ]
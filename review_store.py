@@ -0,0 +1,432 @@
+import contextlib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+
+from reviews import (
+    TEACHER_COLUMN, COMMENT_COLUMN, RATING_COLUMNS, RATING_KEYS,
+    clean_name, to_number, numericise, column_letter,
+)
+
+REVIEW_DB_PATH = os.environ.get("REVIEW_DB_PATH", "reviews.db")
+SHEET_HEADER = [TEACHER_COLUMN] + [column for _, column in RATING_COLUMNS] + [COMMENT_COLUMN]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    teacher TEXT NOT NULL,
+    teacher_key TEXT NOT NULL,
+    teaching REAL NOT NULL DEFAULT 0,
+    leniency REAL NOT NULL DEFAULT 0,
+    correction REAL NOT NULL DEFAULT 0,
+    da_quiz REAL NOT NULL DEFAULT 0,
+    overall REAL NOT NULL DEFAULT 0,
+    comment TEXT NOT NULL DEFAULT '',
+    sheet_row INTEGER UNIQUE,          -- row in the Google Sheet, once known
+    synced INTEGER NOT NULL DEFAULT 0, -- 1 once the row is in the sheet
+    push_lease REAL,                   -- set when a push is claimed: when the claim expires
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_teacher_key ON reviews (teacher_key);
+CREATE INDEX IF NOT EXISTS reviews_unsynced ON reviews (synced) WHERE synced = 0;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_RATING_SQL = ", ".join(RATING_KEYS)
+
+
+def _display_number(value):
+    return int(value) if float(value).is_integer() else value
+
+
+def _sheet_values(header, values):
+    # One sheet row (strings, in header order) as (teacher, *ratings, comment)
+    # in the form the store keeps, for matching against stored reviews
+    values = list(values) + [''] * (len(header) - len(values))
+    record = {column: numericise(value) for column, value in zip(header, values)}
+    row = [record.get(column, '') for column in SHEET_HEADER]
+    return (str(row[0]).strip(), *[to_number(value) for value in row[1:-1]], str(row[-1]))
+
+
+class SQLiteReviewStore:
+    # Primary review store. Reads never touch the network; the Google Sheet is
+    # kept in step by SheetMirror (or not at all in offline mode).
+    def __init__(self, path=REVIEW_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+            if "push_lease" not in {row[1] for row in db.execute("PRAGMA table_info(reviews)")}:
+                try:
+                    db.execute("ALTER TABLE reviews ADD COLUMN push_lease REAL")
+                except sqlite3.OperationalError:
+                    pass  # another process added it first
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so a read-then-write
+        # cannot interleave with another process doing the same
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.rollback()
+            raise
+        db.commit()
+
+    # --- Writes ---
+    def add_review(self, row, sheet_row=None, synced=False):
+        # row is in sheet order: [teacher, teaching, leniency, correction, da_quiz, overall, comment]
+        teacher = str(row[0]).strip()
+        ratings = [to_number(value) for value in row[1:1 + len(RATING_KEYS)]]
+        comment = str(row[1 + len(RATING_KEYS)]) if len(row) > 1 + len(RATING_KEYS) else ''
+        with self._connect() as db:
+            cursor = db.execute(
+                f"INSERT OR IGNORE INTO reviews (teacher, teacher_key, {_RATING_SQL}, comment, sheet_row, synced, created) "
+                f"VALUES (?, ?, {', '.join('?' * len(RATING_KEYS))}, ?, ?, ?, ?)",
+                [teacher, clean_name(teacher), *ratings, comment, sheet_row, int(synced), time.time()],
+            )
+            return cursor.lastrowid if cursor.rowcount else None
+
+    def claim_unsynced(self, limit, lease=120):
+        # Up to limit pending reviews, oldest first, claimed for lease seconds so
+        # that other processes sharing the database do not push them as well.
+        # A claim that is never completed (mark_synced) or released runs out.
+        now = time.time()
+        with self._transaction() as db:
+            rows = db.execute(
+                f"SELECT id, teacher, {_RATING_SQL}, comment FROM reviews "
+                f"WHERE synced = 0 AND (push_lease IS NULL OR push_lease < ?) ORDER BY id LIMIT ?", (now, limit)
+            ).fetchall()
+            db.executemany("UPDATE reviews SET push_lease = ? WHERE id = ?", [(now + lease, row[0]) for row in rows])
+        return rows
+
+    def release(self, ids):
+        # Gives up claims on reviews known not to have reached the sheet
+        with self._connect() as db:
+            db.executemany("UPDATE reviews SET push_lease = NULL WHERE id = ? AND synced = 0", [(i,) for i in ids])
+
+    def mark_synced(self, ids, first_sheet_row=None):
+        # The append reply is authoritative: a review still holding one of these
+        # row numbers has a stale one (rows were deleted from the sheet since),
+        # so it loses it rather than failing the update; reconcile renumbers it
+        with self._connect() as db:
+            for offset, review_id in enumerate(ids):
+                sheet_row = first_sheet_row + offset if first_sheet_row else None
+                if sheet_row is not None:
+                    db.execute("UPDATE reviews SET sheet_row = NULL WHERE sheet_row = ? AND id != ?", (sheet_row, review_id))
+                db.execute("UPDATE reviews SET synced = 1, sheet_row = ?, push_lease = NULL WHERE id = ?",
+                           (sheet_row, review_id))
+
+    def _stored_values(self, db, where, params):
+        return db.execute(f"SELECT id, teacher, {_RATING_SQL}, comment FROM reviews WHERE {where}", params)
+
+    def _insert_from_sheet(self, db, values, sheet_row):
+        teacher, *ratings, comment = values
+        db.execute(
+            f"INSERT INTO reviews (teacher, teacher_key, {_RATING_SQL}, comment, sheet_row, synced, created) "
+            f"VALUES (?, ?, {', '.join('?' * len(RATING_KEYS))}, ?, ?, 1, ?)",
+            [teacher, clean_name(teacher), *ratings, comment, sheet_row, time.time()],
+        )
+
+    def has_sheet_row(self, sheet_row, header, values):
+        # True if the review stored at sheet_row has these values
+        row = self._stored_values(self._connect(), "sheet_row = ?", (sheet_row,)).fetchone()
+        return row is not None and tuple(row[1:]) == _sheet_values(header, values)
+
+    def import_sheet_rows(self, first_row, header, rows):
+        # Rows pulled from the sheet, starting at sheet row first_row. Rows we
+        # already hold at that number are skipped; rows pushed (by any process
+        # sharing the database) whose row number is not known yet are claimed;
+        # everything else is added.
+        added = 0
+        with self._transaction() as db:
+            for offset, values in enumerate(rows):
+                values = _sheet_values(header, values)
+                sheet_row = first_row + offset
+                held = self._stored_values(db, "sheet_row = ?", (sheet_row,)).fetchone()
+                if held is not None:
+                    if tuple(held[1:]) == values:
+                        continue
+                    db.execute("UPDATE reviews SET sheet_row = NULL WHERE id = ?", (held[0],))  # stale number
+                claimed = db.execute(
+                    f"UPDATE reviews SET sheet_row = ?, synced = 1, push_lease = NULL WHERE id = ("
+                    f"SELECT id FROM reviews WHERE sheet_row IS NULL AND (synced = 1 OR push_lease IS NOT NULL) "
+                    f"AND teacher = ? AND {' AND '.join(f'{key} = ?' for key in RATING_KEYS)} AND comment = ? "
+                    f"ORDER BY synced DESC, id LIMIT 1)",
+                    [sheet_row, *values],
+                ).rowcount
+                if not claimed:
+                    self._insert_from_sheet(db, values, sheet_row)
+                    added += 1
+            self._set_meta(db, "pulled_through", first_row + len(rows) - 1)
+        return added
+
+    def reconcile_sheet_rows(self, first_row, header, rows):
+        # Makes the synced reviews match the sheet from first_row down, as read
+        # in full: every sheet row is matched by content to a synced review, or
+        # to one whose push is in flight, and takes that row's number; sheet rows
+        # without a match are added; synced reviews missing from the sheet
+        # (deleted or edited there) are removed. Pending reviews are left to push.
+        # Returns (added, removed).
+        added = 0
+        with self._transaction() as db:
+            candidates = {}
+            for review_id, *values in self._stored_values(
+                db, "synced = 1 OR push_lease IS NOT NULL ORDER BY synced DESC, sheet_row IS NULL, sheet_row, id", ()
+            ):
+                candidates.setdefault(tuple(values), []).append(review_id)
+            synced = {review_id for (review_id,) in db.execute("SELECT id FROM reviews WHERE synced = 1")}
+            db.execute("UPDATE reviews SET sheet_row = NULL WHERE sheet_row IS NOT NULL")
+            for offset, values in enumerate(rows):
+                values = _sheet_values(header, values)
+                matches = candidates.get(values)
+                if matches:
+                    review_id = matches.pop(0)
+                    synced.discard(review_id)
+                    db.execute("UPDATE reviews SET sheet_row = ?, synced = 1, push_lease = NULL WHERE id = ?",
+                               (first_row + offset, review_id))
+                else:
+                    self._insert_from_sheet(db, values, first_row + offset)
+                    added += 1
+            # An empty read with reviews on our side is far likelier a bad read than
+            # every review deleted at once; keep them and let the next reconcile decide
+            removed = len(synced) if rows or not synced else 0
+            if removed:
+                db.executemany("DELETE FROM reviews WHERE id = ?", [(review_id,) for review_id in synced])
+            self._set_meta(db, "pulled_through", first_row + len(rows) - 1)
+        return added, removed
+
+    def _set_meta(self, db, key, value):
+        db.execute("INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                   (key, str(value)))
+
+    def get_meta(self, key, default=None):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    # --- Reads ---
+    def _to_record(self, row):
+        teacher, *ratings, comment = row
+        record = {TEACHER_COLUMN: teacher}
+        for (_, column), value in zip(RATING_COLUMNS, ratings):
+            record[column] = _display_number(value)
+        record[COMMENT_COLUMN] = comment
+        return record
+
+    def records(self):
+        # Every review, oldest first, in the same dict shape as sheet.get_all_records()
+        rows = self._connect().execute(f"SELECT teacher, {_RATING_SQL}, comment FROM reviews ORDER BY id").fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def teacher_reviews(self, teacher_key):
+        rows = self._connect().execute(
+            f"SELECT teacher, {_RATING_SQL}, comment FROM reviews WHERE teacher_key = ? ORDER BY id", (teacher_key,)
+        ).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def teacher_summary(self, teacher_key):
+        # {"count", "sums", "means"} for one teacher, or None if unreviewed
+        row = self._connect().execute(
+            f"SELECT COUNT(*), {', '.join(f'SUM({key})' for key in RATING_KEYS)} FROM reviews WHERE teacher_key = ?",
+            (teacher_key,),
+        ).fetchone()
+        count, *sums = row
+        if not count:
+            return None
+        return {
+            "count": count,
+            "sums": dict(zip(RATING_KEYS, sums)),
+            "means": {key: total / count for key, total in zip(RATING_KEYS, sums)},
+        }
+
+    def rating_rows(self):
+        # (teacher_key, teacher, *ratings) for every review; feeds the columnar stats
+        return self._connect().execute(f"SELECT teacher_key, teacher, {_RATING_SQL} FROM reviews ORDER BY id").fetchall()
+
+    def review_rows(self):
+        # (teacher_key, teacher, *ratings, comment) for every review, grouped by
+        # teacher and oldest first within each; feeds the review snapshot
+        return self._connect().execute(
+            f"SELECT teacher_key, teacher, {_RATING_SQL}, comment FROM reviews ORDER BY teacher_key, id"
+        )
+
+    def version(self):
+        # Changes whenever a review is added; cheap enough to check on every rerun
+        return tuple(self._connect().execute("SELECT COUNT(*), MAX(id) FROM reviews").fetchone())
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+
+    def pending_count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM reviews WHERE synced = 0").fetchone()[0]
+
+
+# --- Google Sheet mirror ---
+def is_rate_limited(exc):
+    # gspread.exceptions.APIError keeps the HTTP response around
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+_UPDATED_RANGE_RE = re.compile(r'![A-Z]+(\d+)')
+
+
+def appended_first_row(response):
+    # append_rows returns the Sheets API reply; updates.updatedRange is e.g. "Sheet1!A42:G44"
+    try:
+        match = _UPDATED_RANGE_RE.search(response["updates"]["updatedRange"])
+    except (TypeError, KeyError):
+        return None
+    return int(match.group(1)) if match else None
+
+
+class SheetMirror:
+    # Background replication between the SQLite store and the Google Sheet:
+    # pushes locally submitted reviews with append_rows in batches, and pulls
+    # rows appended by anyone else (other servers, manual edits at the end of
+    # the sheet). Every reconcile_interval, and whenever rows turn out to have
+    # been deleted from the sheet, it reads the whole sheet instead and
+    # reconciles, which picks up edits and deletions. Pushes are claimed in the
+    # store, so processes sharing one database never push a review twice.
+    # Backs off exponentially on errors, harder on 429 quota errors.
+    # on_change(), if given, runs on the mirror thread after every cycle (whether
+    # or not the sheet was reachable) in which the store's version() changed.
+    # start=False leaves the thread unstarted; call sync_once() directly instead.
+    def __init__(self, store, get_sheet, interval=65, batch_size=50, max_backoff=300, on_change=None, start=True,
+                 reconcile_interval=30 * 60, lease=120):
+        self.store = store
+        self._get_sheet = get_sheet
+        self.on_change = on_change
+        self._notified_version = None
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self.reconcile_interval = reconcile_interval
+        self.lease = lease
+        self._next_reconcile = 0.0  # the first cycle reconciles
+        self._reconcile_due = False
+        self.failures = 0
+        self.last_error = None
+        self._header = None
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sheet-mirror", daemon=True)
+        if start:
+            self._thread.start()
+
+    def wakeup(self):
+        self._wakeup.set()
+
+    def push(self, sheet):
+        pushed = 0
+        while True:
+            rows = self.store.claim_unsynced(self.batch_size, self.lease)
+            if not rows:
+                return pushed
+            ids = [row[0] for row in rows]
+            values = [[row[1], *[_display_number(v) for v in row[2:-1]], row[-1]] for row in rows]
+            try:
+                response = sheet.append_rows(values)
+            except Exception as e:
+                if is_rate_limited(e):
+                    self.store.release(ids)  # refused outright: nothing was appended
+                else:
+                    self._reconcile_due = True  # may have landed anyway; the claims hold until we know
+                raise
+            first = appended_first_row(response)
+            if first is not None and first <= int(self.store.get_meta("pulled_through", 1)):
+                self._reconcile_due = True  # landed among rows we already pulled: some were deleted
+            try:
+                self.store.mark_synced(ids, first)
+            except Exception:
+                self._reconcile_due = True  # the rows are in the sheet; reconcile marks them
+                raise
+            pushed += len(rows)
+
+    def pull(self, sheet):
+        if self._header is None:
+            self._header = sheet.row_values(1)
+        through = int(self.store.get_meta("pulled_through", 1))
+        # Open-ended range: returns nothing when no rows were appended. It starts
+        # at the last row already pulled, which must still be the same review;
+        # if not, rows were deleted from the sheet and row numbers have shifted
+        first = max(through, 2)
+        rows = sheet.get_values(f"A{first}:{column_letter(len(self._header))}")
+        if through >= 2:
+            if not rows or not self.store.has_sheet_row(through, self._header, rows[0]):
+                return self.reconcile(sheet)
+            first, rows = first + 1, rows[1:]
+        if not rows:
+            return 0
+        return self.store.import_sheet_rows(first, self._header, rows)
+
+    def reconcile(self, sheet):
+        values = sheet.get_all_values()
+        self._header = values[0] if values else SHEET_HEADER
+        added, removed = self.store.reconcile_sheet_rows(2, self._header, values[1:])
+        self._reconcile_due = False
+        self._next_reconcile = time.monotonic() + self.reconcile_interval
+        return added + removed
+
+    def sync_once(self):
+        # Returns (pushed, pulled); pulled counts rows removed by a reconcile too
+        sheet = self._get_sheet()
+        if not sheet:
+            raise RuntimeError("Google Sheet is not available")
+        if self._reconcile_due or time.monotonic() >= self._next_reconcile:
+            pulled = self.reconcile(sheet)
+            return self.push(sheet), pulled
+        return self.push(sheet), self.pull(sheet)
+
+    def _run(self):
+        backoff = 0.0
+        while not self._stopped.is_set():
+            try:
+                self.sync_once()
+                backoff = 0.0
+                self.failures = 0
+                self.last_error = None
+            except Exception as e:
+                self.failures += 1
+                self.last_error = e
+                base = 5.0 if is_rate_limited(e) else 1.0
+                backoff = min(self.max_backoff, base * 2 ** (self.failures - 1)) * random.uniform(0.5, 1.0)
+            self._notify_change()
+            if backoff:
+                self._stopped.wait(backoff)
+            else:
+                self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+    def _notify_change(self):
+        # Rows can land in the store without a successful sync (local submits,
+        # a pull that failed halfway), so this compares versions instead
+        if not self.on_change:
+            return
+        try:
+            version = self.store.version()
+            if version != self._notified_version:
+                self.on_change()
+                self._notified_version = version
+        except Exception as e:
+            self.last_error = e
+
+    def close(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=5)
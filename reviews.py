@@ -0,0 +1,47 @@
+import re
+
+# Sheet column headers (some of them carry a trailing space in the sheet)
+TEACHER_COLUMN = 'Teacher '
+COMMENT_COLUMN = 'Comment'
+RATING_COLUMNS = [
+    ("teaching", 'Teaching '),
+    ("leniency", 'Leniency '),
+    ("correction", 'Correction '),
+    ("da_quiz", 'DA/Quiz '),
+    ("overall", 'Overall Rating'),
+]
+RATING_KEYS = [key for key, _ in RATING_COLUMNS]
+
+_TITLE_RE = re.compile(r'^(dr|mr|ms)\s+')
+
+
+def clean_name(name):
+    return _TITLE_RE.sub('', name.strip().lower())
+
+
+def to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# --- Sheet cell helpers ---
+def numericise(value):
+    # Same conversion gspread's get_all_records applies to cell strings
+    if value == '':
+        return value
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def column_letter(n):
+    letters = ''
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
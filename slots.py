@@ -0,0 +1,183 @@
+import functools
+import json
+import os
+import re
+from types import MappingProxyType
+
+# The FFCS slot model (grid, timings, slot -> cells, clash masks) is built once
+# per process from a layout file and frozen. Other semesters or campuses can be
+# used by pointing FFCS_SLOT_LAYOUT at another file in the same format.
+LAYOUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "slot_layouts")
+DEFAULT_LAYOUT_PATH = os.environ.get("FFCS_SLOT_LAYOUT", os.path.join(LAYOUT_DIR, "vitc_chennai.json"))
+
+MINUTES_PER_DAY = 24 * 60
+DAY_MINUTES_MASK = (1 << MINUTES_PER_DAY) - 1
+
+_TIME_RE = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*([AP])M\s*$', re.IGNORECASE)
+
+
+def parse_time(t):
+    # Handles '8:00 AM', '08:00 AM' and '1:25PM'; returns minutes since midnight
+    match = _TIME_RE.match(t)
+    if not match:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2))
+    if not (1 <= hour <= 12 and minute < 60):
+        return None
+    hour %= 12
+    if match.group(3).upper() == "P":
+        hour += 12
+    return hour * 60 + minute
+
+
+def time_range_to_tuple(time_range):
+    # '8:00 AM to 8:50 AM' -> (480, 530); None for '-' (lunch) or anything unparsable
+    if "to" not in time_range:
+        return None
+    start, end = time_range.split(" to ")
+    start, end = parse_time(start), parse_time(end)
+    if start is None or end is None:
+        return None
+    return (start, end)
+
+
+def parse_slots(slot_str):
+    return [s.strip().upper() for s in re.split(r'\+|,|\s+', slot_str) if s.strip()]
+
+
+class SlotLayout:
+    # Read-only after construction: lists are tuples, dicts are mapping proxies.
+    #   days, grid (day -> periods -> slots), theory_times, lab_times
+    #   slot_to_cells: slot -> ((day, period), ...)
+    #   cell_to_slots: (day, period) -> (slot, ...)
+    #   slot_time_map: (day, slot) -> (start, end) minutes
+    #   slot_is_lab: slot -> bool;  cell_has_lab: (day, period) -> bool
+    #   slot_time_mask / slot_cell_mask / slot_mask / slot_day_mask: clash bitmasks
+    def __init__(self, spec):
+        self.name = spec.get("name", "")
+        lab_prefix = spec.get("lab_prefix", "L")
+        self.days = tuple(spec["days"])
+        self.grid = MappingProxyType({
+            day: tuple(tuple(slots) for slots in spec["grid"][day]) for day in self.days
+        })
+        self.theory_times = tuple(spec["theory_times"])
+        self.lab_times = tuple(spec["lab_times"])
+        theory_ranges = [time_range_to_tuple(t) for t in self.theory_times]
+        lab_ranges = [time_range_to_tuple(t) for t in self.lab_times]
+
+        slot_to_cells = {}
+        cell_to_slots = {}
+        slot_time_map = {}
+        slot_is_lab = {}
+        for day in self.days:
+            for period, slots in enumerate(self.grid[day]):
+                cell_to_slots[(day, period)] = slots
+                for slot in slots:
+                    if not slot:
+                        continue
+                    slot_to_cells.setdefault(slot, []).append((day, period))
+                    is_lab = slot.startswith(lab_prefix)
+                    slot_is_lab[slot] = is_lab
+                    ranges = lab_ranges if is_lab else theory_ranges
+                    if period < len(ranges) and ranges[period]:
+                        slot_time_map[(day, slot)] = ranges[period]
+        self.slot_to_cells = MappingProxyType({slot: tuple(cells) for slot, cells in slot_to_cells.items()})
+        self.cell_to_slots = MappingProxyType(cell_to_slots)
+        self.slot_time_map = MappingProxyType(slot_time_map)
+        self.slot_is_lab = MappingProxyType(slot_is_lab)
+        self.cell_has_lab = MappingProxyType({
+            cell: any(slot_is_lab.get(slot, False) for slot in slots) for cell, slots in cell_to_slots.items()
+        })
+
+        # --- Clash masks ---
+        # slot_time_mask: one bit per minute of the week the slot occupies
+        # slot_cell_mask: one bit per (day, period) cell of the grid it sits in
+        # Two slots clash iff either AND is non-zero; slot_mask packs both into one int.
+        cell_bit = {cell: bit for bit, cell in enumerate(cell_to_slots)}
+        slot_time_mask = {}
+        slot_cell_mask = {}
+        slot_day_mask = {}
+        for slot, cells in self.slot_to_cells.items():
+            time_mask = 0
+            cell_mask = 0
+            day_mask = 0
+            for day, period in cells:
+                day_index = self.days.index(day)
+                cell_mask |= 1 << cell_bit[(day, period)]
+                day_mask |= 1 << day_index
+                start, end = slot_time_map.get((day, slot), (None, None))
+                if start is not None and end > start:
+                    time_mask |= ((1 << (end - start)) - 1) << (day_index * MINUTES_PER_DAY + start)
+            slot_time_mask[slot] = time_mask
+            slot_cell_mask[slot] = cell_mask
+            slot_day_mask[slot] = day_mask
+        self.cell_bit = MappingProxyType(cell_bit)
+        self.cell_mask_offset = len(self.days) * MINUTES_PER_DAY
+        self.slot_time_mask = MappingProxyType(slot_time_mask)
+        self.slot_cell_mask = MappingProxyType(slot_cell_mask)
+        self.slot_mask = MappingProxyType({
+            slot: slot_time_mask[slot] | (slot_cell_mask[slot] << self.cell_mask_offset) for slot in slot_time_mask
+        })
+        self.slot_day_mask = MappingProxyType(slot_day_mask)
+
+    def clash_days(self, slot1, slot2):
+        overlap = self.slot_time_mask.get(slot1, 0) & self.slot_time_mask.get(slot2, 0)
+        found = [day for i, day in enumerate(self.days) if (overlap >> (i * MINUTES_PER_DAY)) & DAY_MINUTES_MASK]
+        if not found:
+            cells = self.slot_cell_mask.get(slot1, 0) & self.slot_cell_mask.get(slot2, 0)
+            found = [day for day in self.days if any(cells >> self.cell_bit[(day, p)] & 1 for p in range(len(self.grid[day])))]
+        return found
+
+    def slots_clash(self, slot1, slot2):
+        return bool(self.slot_mask[slot1] & self.slot_mask[slot2])
+
+    def find_clashes(self, slots, taken_slots=()):
+        # Checks a candidate slot set against itself and against the slots already
+        # in the timetable. Returns (invalid_slots, input_clashes, timetable_clashes);
+        # the clash lists hold every conflicting (slot, other_slot, days), not just the first.
+        invalid = [slot for slot in slots if slot not in self.slot_to_cells]
+        valid = [slot for slot in slots if slot in self.slot_to_cells]
+        input_clashes = []
+        for i in range(len(valid)):
+            for j in range(i + 1, len(valid)):
+                if self.slots_clash(valid[i], valid[j]):
+                    input_clashes.append((valid[i], valid[j], self.clash_days(valid[i], valid[j])))
+        taken = [slot for slot in dict.fromkeys(taken_slots) if slot in self.slot_to_cells]
+        taken_mask = 0
+        for slot in taken:
+            taken_mask |= self.slot_mask[slot]
+        timetable_clashes = []
+        for slot in valid:
+            # One AND against the whole timetable; only walk it to name the culprits
+            if self.slot_mask[slot] & taken_mask:
+                for other in taken:
+                    if self.slots_clash(slot, other):
+                        timetable_clashes.append((slot, other, self.clash_days(slot, other)))
+        return invalid, input_clashes, timetable_clashes
+
+
+@functools.lru_cache(maxsize=None)
+def load_slot_layout(path=DEFAULT_LAYOUT_PATH):
+    with open(path, 'r') as f:
+        return SlotLayout(json.load(f))
+
+
+# --- Default layout, exposed under the names the planner has always used ---
+layout = load_slot_layout()
+days = layout.days
+timetableData = layout.grid
+theory_times = layout.theory_times
+lab_times = layout.lab_times
+slot_to_cells = layout.slot_to_cells
+cell_to_slots = layout.cell_to_slots
+slot_time_map = layout.slot_time_map
+slot_is_lab = layout.slot_is_lab
+cell_has_lab = layout.cell_has_lab
+cell_bit = layout.cell_bit
+slot_time_mask = layout.slot_time_mask
+slot_cell_mask = layout.slot_cell_mask
+slot_mask = layout.slot_mask
+slot_day_mask = layout.slot_day_mask
+clash_days = layout.clash_days
+slots_clash = layout.slots_clash
+find_clashes = layout.find_clashes
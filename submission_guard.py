@@ -0,0 +1,153 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# Process-wide spam guard for review submissions. Everything here is bounded
+# LRU state in memory: it is shared by every session served by this process,
+# survives page reloads, and never grows past max_keys entries per table.
+
+_NON_WORD_RE = re.compile(r'[\W_]+')
+_REPEAT_RE = re.compile(r'(.)\1{2,}')
+
+
+def normalize_comment(text):
+    # "Great  teacher!!!" / "great teacher" / "GREAAAT teacher :)" all normalize alike
+    text = unicodedata.normalize("NFKC", str(text)).casefold()
+    text = _NON_WORD_RE.sub(' ', text)
+    text = _REPEAT_RE.sub(r'\1', text)
+    return ' '.join(text.split())
+
+
+def comment_hash(text):
+    normalized = normalize_comment(text)
+    if not normalized:
+        return None
+    return hashlib.blake2b(normalized.encode(), digest_size=8).digest()
+
+
+class TokenBucketLimiter:
+    # One token bucket per key: capacity tokens, refilled at rate tokens per
+    # second. Least recently used keys are dropped beyond max_keys; a dropped key
+    # comes back with a full bucket, so max_keys should comfortably cover the
+    # keys active within one refill period.
+    def __init__(self, capacity, rate, max_keys=100_000):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, last refill time)
+        self._lock = threading.Lock()
+
+    def _level(self, key, now):
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def retry_after(self, key, now=None):
+        # Seconds until key can spend one token (0 if it can now)
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens = self._level(key, now)
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def consume(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens = self._level(key, now)
+            if tokens < 1:
+                return False
+            self._buckets[key] = (tokens - 1, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return True
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class RecentSet:
+    # Keys seen within the last ttl seconds, LRU-bounded to max_keys
+    def __init__(self, ttl, max_keys=100_000):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            seen = self._seen.get(key)
+            return seen is not None and now - seen < self.ttl
+
+    def add(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._seen[key] = now
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+
+    def __len__(self):
+        return len(self._seen)
+
+
+class SubmissionGuard:
+    # Decides whether a review submission may go into the store. Checks, in order:
+    #   per client + teacher:  one review per teacher every teacher_interval seconds
+    #   per network + teacher: network_teacher_burst reviews per teacher_interval
+    #   per client:            client_burst reviews, then one per client_interval
+    #   per network:           network_burst reviews, then one per client_interval
+    #   near-duplicate text:   same normalized comment for a teacher within duplicate_ttl
+    #   whole process:         global_burst reviews, then global_rate per second
+    # The client id is whatever the browser presents and is free to replace; the
+    # network id (the client's IP) is not, but is shared behind a NAT, hence the
+    # larger network allowances. check() returns (True, None) or (False, reason);
+    # reasons are user-facing.
+    def __init__(self, teacher_interval=24 * 3600, client_burst=5, client_interval=60, network_teacher_burst=3,
+                 network_burst=20, duplicate_ttl=24 * 3600, global_burst=60, global_rate=1.0, max_keys=100_000):
+        self.per_teacher = TokenBucketLimiter(1, 1 / teacher_interval, max_keys)
+        self.per_network_teacher = TokenBucketLimiter(network_teacher_burst, network_teacher_burst / teacher_interval,
+                                                      max_keys)
+        self.per_client = TokenBucketLimiter(client_burst, 1 / client_interval, max_keys)
+        self.per_network = TokenBucketLimiter(network_burst, 1 / client_interval, max_keys)
+        self.overall = TokenBucketLimiter(global_burst, global_rate, 1)
+        self.comments = RecentSet(duplicate_ttl, max_keys)
+        self._lock = threading.Lock()
+        self.accepted = 0
+        self.rejected = 0
+
+    def check(self, client_id, teacher_key, comment='', network_id=None):
+        # Buckets are only charged once every check has passed, so a rejected
+        # submission never costs the client a token. network_id=None skips the
+        # network checks.
+        charges = [(self.per_teacher, (client_id, teacher_key)), (self.per_client, client_id)]
+        if network_id is not None:
+            charges += [(self.per_network_teacher, (network_id, teacher_key)), (self.per_network, network_id)]
+        digest = comment_hash(comment)
+        with self._lock:
+            now = time.monotonic()
+            if self.per_teacher.retry_after((client_id, teacher_key), now) or (
+                    network_id is not None and self.per_network_teacher.retry_after((network_id, teacher_key), now)):
+                reason = "You have already reviewed this teacher recently."
+            elif self.per_client.retry_after(client_id, now):
+                wait = self.per_client.retry_after(client_id, now)
+                reason = f"Too many reviews from this device. Try again in {wait:.0f} seconds."
+            elif network_id is not None and self.per_network.retry_after(network_id, now):
+                wait = self.per_network.retry_after(network_id, now)
+                reason = f"Too many reviews from your network. Try again in {wait:.0f} seconds."
+            elif digest is not None and self.comments.seen((teacher_key, digest), now):
+                reason = "An identical comment was already submitted for this teacher."
+            elif self.overall.retry_after(None, now):
+                reason = "Reviews are coming in faster than we can take them. Please try again in a minute."
+            else:
+                for limiter, key in charges:
+                    limiter.consume(key, now)
+                self.overall.consume(None, now)
+                if digest is not None:
+                    self.comments.add((teacher_key, digest), now)
+                self.accepted += 1
+                return True, None
+            self.rejected += 1
+            return False, reason
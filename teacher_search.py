@@ -0,0 +1,133 @@
+import heapq
+import re
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+from operator import itemgetter
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_TITLES = {"dr", "mr", "ms", "mrs", "prof"}
+
+# Score of a query token against one name token
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.9
+INFIX_SCORE = 0.7  # "kumar" inside "rajakumar"
+FUZZY_SCORE = 0.8  # at similarity 1.0, FUZZY_FLOOR at min_similarity
+FUZZY_FLOOR = 0.5
+INITIAL_SCORE = 0.3  # "s" in "Ibrahim S P" for a query token "syed"
+SUBSTRING_BONUS = 0.5  # whole query is a substring of the name (old behaviour)
+
+
+def tokenize(name):
+    return [token for token in _TOKEN_RE.findall(name.lower()) if token not in _TITLES]
+
+
+def trigrams(token):
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TeacherSearchIndex:
+    # Token and trigram postings over the cleaned teacher names. Matches are
+    # ranked by how well each query token matches some token of the name
+    # (exact > prefix > typo > initial), independent of token order.
+    def __init__(self, names, max_expansions=500, min_similarity=0.3, max_postings=2000):
+        self.names = list(names)
+        self.max_expansions = max_expansions
+        self.max_postings = max_postings
+        self.min_similarity = min_similarity
+        postings = {}
+        for name_id, name in enumerate(self.names):
+            for token in set(tokenize(name)):
+                postings.setdefault(token, []).append(name_id)
+        self.postings = postings
+        self.vocab = sorted(postings)
+        self.gram_postings = {}
+        self.letter_tokens = {}  # letter -> vocab tokens containing it, for short infix queries
+        for token in self.vocab:
+            for gram in trigrams(token):
+                self.gram_postings.setdefault(gram, []).append(token)
+            for letter in set(token):
+                self.letter_tokens.setdefault(letter, []).append(token)
+
+    def _candidate_tokens(self, query_token, match_initials, max_postings):
+        # [(vocab token, score)] best first, cut off once their postings reach
+        # max_postings, so very broad queries still have bounded latency
+        scores = {}
+        # Prefix matches (includes the exact match), capped like a search engine's max_expansions
+        start = bisect_left(self.vocab, query_token)
+        for token in self.vocab[start:start + self.max_expansions]:
+            if not token.startswith(query_token):
+                break
+            scores[token] = EXACT_SCORE if token == query_token else PREFIX_SCORE
+        # Initials in the roster ("Ibrahim S P") match a full query token; only
+        # for multi-token queries, otherwise every name with that initial matches
+        initial = query_token[0]
+        if match_initials and initial in self.postings and initial not in scores:
+            scores[initial] = INITIAL_SCORE
+        # Typos, via trigram overlap (not needed when the token is in the roster as typed)
+        if len(query_token) >= 3 and query_token not in self.postings:
+            query_grams = trigrams(query_token)
+            shared = Counter(chain.from_iterable(self.gram_postings.get(gram, ()) for gram in query_grams))
+            for token, common in shared.items():
+                similarity = common / (len(query_grams) + len(token) - common)
+                if similarity >= self.min_similarity:
+                    score = FUZZY_FLOOR + (FUZZY_SCORE - FUZZY_FLOOR) * (similarity - self.min_similarity) / (1 - self.min_similarity)
+                    if score > scores.get(token, 0):
+                        scores[token] = score
+        ranked = heapq.nlargest(self.max_expansions, scores.items(), key=itemgetter(1))
+        # Infix matches, so the names the old substring scan found are still
+        # candidates: walk the shortest token list that every match is on (an
+        # inner trigram's, or a letter's for one- and two-letter query tokens)
+        # and check with `in`, lazily, since the budget usually runs out first
+        if len(query_token) >= 3:
+            lists = [self.gram_postings.get(gram, ()) for gram in trigrams(query_token) if "$" not in gram]
+        else:
+            lists = [self.letter_tokens.get(letter, ()) for letter in query_token]
+        infixes = ((token, INFIX_SCORE) for token in min(lists, key=len)
+                   if query_token in token and scores.get(token, 0) < INFIX_SCORE)
+        candidates = []
+        taken = set()
+        budget = max_postings
+        for token, score in chain(((t, s) for t, s in ranked if s >= INFIX_SCORE), infixes,
+                                  ((t, s) for t, s in ranked if s < INFIX_SCORE)):
+            if budget <= 0:
+                break
+            if token not in taken:
+                taken.add(token)
+                candidates.append((token, score))
+                budget -= len(self.postings[token])
+        return candidates
+
+    def search(self, query, limit=25):
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return []
+        name_scores = {}
+        for query_token in query_tokens:
+            # Candidates come best first, so in reverse each name ends up with its best
+            # score. The postings budget is shared by the query's tokens.
+            candidates = self._candidate_tokens(query_token, len(query_tokens) > 1, self.max_postings // len(query_tokens))
+            best = {}
+            for token, score in reversed(candidates):
+                best.update(dict.fromkeys(self.postings[token], score))
+            if not name_scores:
+                name_scores = best
+                continue
+            for name_id, score in best.items():
+                name_scores[name_id] = name_scores.get(name_id, 0) + score
+        if not name_scores:
+            return []
+        cleaned_query = " ".join(query_tokens)
+        n_tokens = len(query_tokens)
+        for name_id in name_scores:
+            name_scores[name_id] /= n_tokens
+            if cleaned_query in self.names[name_id]:
+                name_scores[name_id] += SUBSTRING_BONUS
+        # Drop weak partial matches (e.g. only an initial matched) when better ones exist
+        cutoff = max(name_scores.values()) * 0.5
+        ranked = heapq.nsmallest(
+            limit,
+            ((-score, name_id) for name_id, score in name_scores.items() if score >= cutoff),
+        )
+        return [name_id for _, name_id in ranked]
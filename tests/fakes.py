@@ -0,0 +1,48 @@
+import re
+import threading
+from collections import Counter
+
+
+class FakeWorksheet:
+    # Just the gspread worksheet calls SheetMirror makes, with a per-method call
+    # count. Shared by the tests and benchmarks/load_test.py.
+    def __init__(self, header, rows=()):
+        self.rows = [list(header)] + [list(row) for row in rows]
+        self.calls = Counter()
+        self.fail_next = None  # exception raised by the next call, then cleared
+        self._lock = threading.Lock()
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if self.fail_next is not None:
+            error, self.fail_next = self.fail_next, None
+            raise error
+
+    def row_values(self, row):
+        with self._lock:
+            self._call("row_values")
+            return list(self.rows[row - 1])
+
+    def get_values(self, range_name):
+        with self._lock:
+            self._call("get_values")
+            first = int(re.match(r'A(\d+)', range_name).group(1))
+            return [[str(value) for value in row] for row in self.rows[first - 1:]]
+
+    def get_all_values(self):
+        with self._lock:
+            self._call("get_all_values")
+            return [[str(value) for value in row] for row in self.rows]
+
+    def append_rows(self, rows):
+        with self._lock:
+            self._call("append_rows")
+            first = len(self.rows) + 1
+            self.rows.extend(list(row) for row in rows)
+            return {"updates": {"updatedRange": f"Sheet1!A{first}:G{len(self.rows)}"}}
+
+    def delete_rows(self, start_index, end_index=None):
+        # Rows below move up, as in Google Sheets
+        with self._lock:
+            self._call("delete_rows")
+            del self.rows[start_index - 1:(end_index or start_index)]
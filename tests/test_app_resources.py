@@ -0,0 +1,23 @@
+from app_resources import client_address
+
+PROXIES = frozenset({"10.0.0.2", "10.0.0.3"})
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers():
+    assert client_address("203.0.113.7", "198.51.100.1", PROXIES) == "203.0.113.7"
+    assert client_address("203.0.113.7", "198.51.100.1", frozenset()) == "203.0.113.7"
+
+
+def test_forwarded_for_from_a_trusted_proxy_names_the_client():
+    assert client_address("10.0.0.2", "198.51.100.1", PROXIES) == "198.51.100.1"
+    assert client_address("10.0.0.2", "198.51.100.1, 10.0.0.3", PROXIES) == "198.51.100.1"
+
+
+def test_client_set_hops_before_ours_are_ignored():
+    # The client sent "X-Forwarded-For: 1.2.3.4"; our proxy appended its real address
+    assert client_address("10.0.0.2", "1.2.3.4, 198.51.100.1", PROXIES) == "198.51.100.1"
+
+
+def test_missing_forwarded_for_falls_back_to_the_peer():
+    assert client_address("10.0.0.2", None, PROXIES) == "10.0.0.2"
+    assert client_address("10.0.0.2", " , ", PROXIES) == "10.0.0.2"
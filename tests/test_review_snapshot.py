@@ -0,0 +1,126 @@
+import os
+import random
+import time
+
+import pytest
+
+from review_snapshot import HISTOGRAM_BINS, ReviewSnapshot, SnapshotBuilder, build_snapshot, read_snapshot_version
+from review_store import SQLiteReviewStore
+from reviews import RATING_COLUMNS, clean_name
+
+TEACHERS = ["Dr. Ganesan R", "Dr. Geetha S", "Dr. Émile Zola", "Dr. Ñandú Pérez", "Dr. 山田 太郎", "Dr. Zoë 😀", "Dr. Ａ Ｂ"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteReviewStore(str(tmp_path / "reviews.db"))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "reviews.snapshot")
+
+
+def add_reviews(store, n, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        ratings = [rng.randint(0, 10) for _ in range(4)]
+        store.add_review([rng.choice(TEACHERS), *ratings, sum(ratings) / 4, rng.choice(["", "good", "très bien", f"#{i}"])])
+
+
+def test_round_trip_matches_the_store(store, path):
+    add_reviews(store, 300)
+    assert build_snapshot(store, path, latest=5)
+    snapshot = ReviewSnapshot(path)
+    assert snapshot.n_teachers == len(TEACHERS)
+    assert snapshot.review_count == 300
+    assert snapshot.version == store.version()
+    for teacher in TEACHERS:
+        key = clean_name(teacher)
+        expected = store.teacher_summary(key)
+        summary = snapshot.teacher_summary(key)
+        assert summary["count"] == expected["count"]
+        assert summary["sums"] == pytest.approx(expected["sums"])
+        assert summary["means"] == pytest.approx(expected["means"])
+        reviews = store.teacher_reviews(key)
+        assert snapshot.latest_reviews(key) == reviews[-5:]
+        for rating, column in RATING_COLUMNS:
+            histogram = [0] * HISTOGRAM_BINS
+            for review in reviews:
+                histogram[round(review[column])] += 1
+            assert snapshot.histogram(key, rating) == histogram
+
+
+def test_unknown_teachers(store, path):
+    add_reviews(store, 20)
+    build_snapshot(store, path)
+    snapshot = ReviewSnapshot(path)
+    for key in ["", "nobody", "dr. ganesan", "zzzz", "\U0010ffff"]:
+        assert snapshot.teacher_summary(key) is None
+        assert snapshot.latest_reviews(key) == []
+        assert snapshot.histogram(key) == [0] * HISTOGRAM_BINS
+
+
+def test_empty_store(store, path):
+    assert build_snapshot(store, path)
+    assert read_snapshot_version(path) == (0, None)
+    snapshot = ReviewSnapshot(path)
+    assert (snapshot.n_teachers, snapshot.version) == (0, (0, None))
+    assert snapshot.teacher_summary("dr. ganesan r") is None
+    assert not build_snapshot(store, path)  # already current
+
+
+def test_long_comments_are_truncated(store, path):
+    store.add_review(["Dr. Ganesan R", 5, 5, 5, 5, 5, "x" * 70000])
+    store.add_review(["Dr. Ganesan R", 5, 5, 5, 5, 5, "é" * 40000])  # cut inside a character
+    build_snapshot(store, path)
+    long_ascii, long_accented = ReviewSnapshot(path).latest_reviews(clean_name("Dr. Ganesan R"))
+    assert long_ascii["Comment"] == "x" * 0xFFFF
+    assert long_accented["Comment"].startswith("é" * 32767)
+
+
+def test_refresh_picks_up_a_rebuilt_file(store, path):
+    add_reviews(store, 10)
+    build_snapshot(store, path)
+    snapshot = ReviewSnapshot(path)
+    assert not snapshot.refresh()
+
+    store.add_review(["Dr. New Teacher", 9, 9, 9, 9, 9, "new"])
+    build_snapshot(store, path)
+    assert snapshot.teacher_summary(clean_name("Dr. New Teacher")) is None
+    assert snapshot.refresh()
+    assert snapshot.teacher_summary(clean_name("Dr. New Teacher"))["count"] == 1
+    assert snapshot.version == store.version()
+
+
+@pytest.mark.parametrize("damage", ["garbage", "truncated", "empty"])
+def test_refresh_keeps_serving_through_a_bad_file(store, path, damage):
+    add_reviews(store, 50)
+    build_snapshot(store, path)
+    snapshot = ReviewSnapshot(path)
+    before = snapshot.teacher_summary(clean_name("Dr. Ganesan R"))
+    with open(path, "rb") as f:
+        data = f.read()
+    bad = {"garbage": os.urandom(len(data)), "truncated": data[:len(data) // 10], "empty": b""}[damage]
+    with open(path + ".bad", "wb") as f:
+        f.write(bad)
+    os.replace(path + ".bad", path)
+
+    assert not snapshot.refresh()
+    assert snapshot.teacher_summary(clean_name("Dr. Ganesan R")) == before
+    assert ReviewSnapshot(path).version is None
+    assert read_snapshot_version(path) is None
+
+
+def test_builder_rebuilds_in_the_background(store, path):
+    builder = SnapshotBuilder(store, path, debounce=0.01)
+    try:
+        add_reviews(store, 10)
+        builder.request()
+        deadline = time.monotonic() + 5
+        while read_snapshot_version(path) != store.version() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert read_snapshot_version(path) == store.version()
+        assert builder.last_error is None
+    finally:
+        builder.close()
@@ -0,0 +1,232 @@
+import time
+
+import pytest
+
+from review_store import SHEET_HEADER, SheetMirror, SQLiteReviewStore
+from tests.fakes import FakeWorksheet
+
+
+def review(teacher="Dr. Ganesan R", rating=7, comment="good"):
+    return [teacher, rating, rating, rating, rating, rating, comment]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteReviewStore(str(tmp_path / "reviews.db"))
+
+
+def make_mirror(store, sheet, **kwargs):
+    return SheetMirror(store, lambda: sheet, start=False, **kwargs)
+
+
+def test_push_appends_pending_reviews_in_batches(store):
+    sheet = FakeWorksheet(SHEET_HEADER)
+    for i in range(5):
+        store.add_review(review(comment=f"comment {i}"))
+    mirror = make_mirror(store, sheet, batch_size=2)
+
+    assert mirror.push(sheet) == 5
+    assert sheet.calls["append_rows"] == 3
+    assert [row[-1] for row in sheet.rows[1:]] == [f"comment {i}" for i in range(5)]
+    assert store.pending_count() == 0
+    assert mirror.push(sheet) == 0
+    assert sheet.calls["append_rows"] == 3
+
+
+def test_pushed_values_use_sheet_number_format(store):
+    sheet = FakeWorksheet(SHEET_HEADER)
+    store.add_review(["Dr. Ganesan R", 7, 8, 9, 10, 8.5, ""])
+    make_mirror(store, sheet).push(sheet)
+    assert sheet.rows[1] == ["Dr. Ganesan R", 7, 8, 9, 10, 8.5, ""]
+
+
+def test_pull_imports_rows_appended_elsewhere(store):
+    sheet = FakeWorksheet(SHEET_HEADER, [review(comment="from the sheet"), review("Dr. Geetha S", 3, "")])
+    mirror = make_mirror(store, sheet)
+
+    assert mirror.sync_once() == (0, 2)
+    records = store.records()
+    assert [record["Comment"] for record in records] == ["from the sheet", ""]
+    assert records[1]["Overall Rating"] == 3
+    assert store.pending_count() == 0
+
+    sheet.append_rows([review("Dr. Geetha S", 9, "later")])
+    assert mirror.sync_once() == (0, 1)
+    assert mirror.sync_once() == (0, 0)
+    assert store.count() == 3
+
+
+def test_own_rows_are_not_pulled_back(store):
+    sheet = FakeWorksheet(SHEET_HEADER)
+    store.add_review(review(comment="mine"))
+    mirror = make_mirror(store, sheet)
+
+    assert mirror.sync_once() == (1, 0)
+    assert mirror.sync_once() == (0, 0)
+    assert store.count() == 1
+    assert len(sheet.rows) == 2
+
+
+def test_rows_pushed_without_a_row_number_are_claimed_not_duplicated(store):
+    sheet = FakeWorksheet(SHEET_HEADER)
+    sheet.append_rows([review(comment="someone else")])
+    append_rows = sheet.append_rows
+    sheet.append_rows = lambda rows: append_rows(rows) and None  # reply without updatedRange
+    store.add_review(review(comment="mine"))
+    mirror = make_mirror(store, sheet)
+
+    assert mirror.sync_once() == (1, 1)
+    assert sorted(record["Comment"] for record in store.records()) == ["mine", "someone else"]
+
+
+def test_failed_append_leaves_reviews_pending(store):
+    sheet = FakeWorksheet(SHEET_HEADER)
+    store.add_review(review())
+    mirror = make_mirror(store, sheet)
+    sheet.fail_next = RuntimeError("429")
+
+    with pytest.raises(RuntimeError):
+        mirror.sync_once()
+    assert store.pending_count() == 1
+    assert len(sheet.rows) == 1
+
+
+def test_push_after_rows_were_deleted_from_the_sheet(store):
+    # The new row lands on a number an older review still holds; that used to
+    # fail mark_synced (UNIQUE sheet_row) and append the review again next cycle
+    sheet = FakeWorksheet(SHEET_HEADER, [review(comment=f"old {i}") for i in range(3)])
+    mirror = make_mirror(store, sheet)
+    mirror.sync_once()
+    sheet.delete_rows(2)
+    store.add_review(review(comment="mine"))
+
+    assert mirror.sync_once()[0] == 1
+    mirror.sync_once()
+    assert [row[-1] for row in sheet.rows[1:]] == ["old 1", "old 2", "mine"]
+    assert sorted(record["Comment"] for record in store.records()) == ["mine", "old 1", "old 2"]
+    assert store.pending_count() == 0
+
+
+def test_rows_appended_after_a_deletion_are_pulled(store):
+    sheet = FakeWorksheet(SHEET_HEADER, [review(comment=f"old {i}") for i in range(3)])
+    mirror = make_mirror(store, sheet)
+    mirror.sync_once()
+    sheet.delete_rows(3)
+    sheet.append_rows([review(comment="from elsewhere")])  # lands on row 4, already pulled through
+
+    mirror.sync_once()
+    assert sorted(record["Comment"] for record in store.records()) == ["from elsewhere", "old 0", "old 2"]
+    mirror.sync_once()
+    assert store.count() == 3
+
+
+def test_reconcile_picks_up_edits_and_deletions(store):
+    sheet = FakeWorksheet(SHEET_HEADER, [review(comment=f"old {i}") for i in range(3)])
+    mirror = make_mirror(store, sheet, reconcile_interval=0)
+    mirror.sync_once()
+    sheet.rows[1][-1] = "edited"
+    sheet.delete_rows(4)
+
+    assert mirror.sync_once() == (0, 3)  # one added, two removed
+    assert sorted(record["Comment"] for record in store.records()) == ["edited", "old 1"]
+
+
+def test_an_empty_sheet_read_removes_nothing(store):
+    sheet = FakeWorksheet(SHEET_HEADER, [review()])
+    mirror = make_mirror(store, sheet, reconcile_interval=0)
+    mirror.sync_once()
+    sheet.rows[1:] = []
+
+    mirror.sync_once()
+    assert store.count() == 1
+
+
+def test_mirrors_sharing_a_database_push_each_review_once(tmp_path):
+    path = str(tmp_path / "reviews.db")
+    sheet = FakeWorksheet(SHEET_HEADER)
+    first, second = SQLiteReviewStore(path), SQLiteReviewStore(path)
+    for i in range(10):
+        first.add_review(review(comment=f"comment {i}"))
+    append_rows = sheet.append_rows
+
+    def append_then_let_the_other_mirror_push(rows):
+        response = append_rows(rows)
+        if sheet.calls["append_rows"] == 1:
+            assert make_mirror(second, sheet, batch_size=3).push(sheet) == 7
+        return response
+
+    sheet.append_rows = append_then_let_the_other_mirror_push
+    assert make_mirror(first, sheet, batch_size=3).push(sheet) == 3
+    assert sorted(row[-1] for row in sheet.rows[1:]) == sorted(f"comment {i}" for i in range(10))
+    assert first.pending_count() == 0
+
+
+def test_an_append_that_may_have_landed_is_not_pushed_again(store):
+    # The request failed after the sheet took the rows: the claim holds the
+    # review back and the next cycle's reconcile finds it in the sheet
+    sheet = FakeWorksheet(SHEET_HEADER)
+    store.add_review(review(comment="mine"))
+    mirror = make_mirror(store, sheet)
+    mirror.sync_once()
+    store.add_review(review(comment="again"))
+    append_rows = sheet.append_rows
+
+    def append_then_fail(rows):
+        append_rows(rows)
+        raise ConnectionError("reset by peer")
+
+    sheet.append_rows = append_then_fail
+    with pytest.raises(ConnectionError):
+        mirror.sync_once()
+    sheet.append_rows = append_rows
+    mirror.sync_once()
+    assert [row[-1] for row in sheet.rows[1:]] == ["mine", "again"]
+    assert store.pending_count() == 0
+
+
+def test_rate_limited_append_is_retried(store):
+    class RateLimited(Exception):
+        response = type("Response", (), {"status_code": 429})()
+
+    sheet = FakeWorksheet(SHEET_HEADER)
+    mirror = make_mirror(store, sheet)
+    mirror.sync_once()
+    store.add_review(review())
+    sheet.fail_next = RateLimited()
+    with pytest.raises(RateLimited):
+        mirror.sync_once()
+    assert mirror.sync_once()[0] == 1
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_background_thread_pushes_on_wakeup(store):
+    sheet = FakeWorksheet(SHEET_HEADER)
+    mirror = SheetMirror(store, lambda: sheet, interval=60)
+    try:
+        assert wait_for(lambda: sheet.calls["get_all_values"] >= 1)
+        store.add_review(review())
+        mirror.wakeup()
+        assert wait_for(lambda: len(sheet.rows) == 2)
+        assert wait_for(lambda: store.pending_count() == 0)
+    finally:
+        mirror.close()
+
+
+def test_background_thread_backs_off_when_the_sheet_is_down(store):
+    def no_sheet():
+        raise RuntimeError("Google Sheet is not available")
+
+    mirror = SheetMirror(store, no_sheet, interval=60, max_backoff=0.05)
+    try:
+        assert wait_for(lambda: mirror.failures >= 2)
+        assert isinstance(mirror.last_error, RuntimeError)
+    finally:
+        mirror.close()
@@ -0,0 +1,40 @@
+import pytest
+
+from slots import find_clashes, parse_slots
+
+
+def test_theory_and_lab_clash_on_the_shared_day():
+    # F1 and L15 only meet on Wednesday
+    assert find_clashes(["F1", "L15"]) == ([], [("F1", "L15", ["WED"])], [])
+
+
+def test_lab_and_theory_in_the_same_cell_clash():
+    assert find_clashes(["L1", "A1"]) == ([], [("L1", "A1", ["MON"])], [])
+
+
+def test_adjacent_lab_slots_are_accepted():
+    assert find_clashes(parse_slots("L15+L16")) == ([], [], [])
+
+
+@pytest.mark.parametrize("slot", ["Z9", "L999", "", "a1"])
+def test_unknown_slots_are_invalid(slot):
+    invalid, input_clashes, timetable_clashes = find_clashes([slot, "B1"])
+    assert invalid == [slot]
+    assert input_clashes == timetable_clashes == []
+
+
+def test_a_slot_given_twice_clashes_with_itself():
+    assert find_clashes(parse_slots("A1+A1")) == ([], [("A1", "A1", ["MON", "WED"])], [])
+
+
+def test_every_clashing_pair_is_reported():
+    invalid, input_clashes, timetable_clashes = find_clashes(["F1", "L15", "L1", "A1"])
+    assert invalid == []
+    assert {(a, b) for a, b, _ in input_clashes} == {("F1", "L15"), ("L1", "A1")}
+    assert timetable_clashes == []
+
+
+def test_clashes_with_the_timetable_name_every_culprit():
+    invalid, input_clashes, timetable_clashes = find_clashes(["A1", "F1"], taken_slots=["L1", "L15", "B1", "L1"])
+    assert (invalid, input_clashes) == ([], [])
+    assert timetable_clashes == [("A1", "L1", ["MON"]), ("F1", "L15", ["WED"])]
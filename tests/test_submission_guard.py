@@ -0,0 +1,94 @@
+import random
+import threading
+from collections import Counter
+
+from submission_guard import SubmissionGuard, TokenBucketLimiter, comment_hash
+
+TEACHERS = [f"teacher {i}" for i in range(20)]
+COMMENTS = ["Great teacher!", "great  teacher", "GREAAAT teacher :)", "strict but fair", "", "avoid", "Avoid!!!"]
+
+
+def run_sessions(guard, sessions, n_submissions=200):
+    # sessions: [(client_id, network_id)], one thread each, all started together
+    accepted = []
+    lock = threading.Lock()
+    start = threading.Barrier(len(sessions))
+
+    def session(seed, client_id, network_id):
+        rng = random.Random(seed)
+        start.wait()
+        for _ in range(n_submissions):
+            teacher = rng.choice(TEACHERS)
+            comment = rng.choice(COMMENTS) if rng.random() < 0.7 else f"comment {rng.random()}"
+            if guard.check(client_id, teacher, comment, network_id=network_id)[0]:
+                with lock:
+                    accepted.append((client_id, network_id, teacher, comment))
+
+    threads = [threading.Thread(target=session, args=(seed, *ids)) for seed, ids in enumerate(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return accepted
+
+
+def test_concurrent_sessions_never_exceed_the_limits():
+    guard = SubmissionGuard(global_burst=1000)
+    # Four browser sessions per client, three clients behind each network
+    sessions = [(f"client {c}", f"10.0.0.{c // 3}") for c in range(12) for _ in range(4)]
+    accepted = run_sessions(guard, sessions)
+
+    per_pair = Counter((client, teacher) for client, _, teacher, _ in accepted)
+    per_client = Counter(client for client, _, _, _ in accepted)
+    per_network_pair = Counter((network, teacher) for _, network, teacher, _ in accepted)
+    per_comment = Counter((teacher, comment_hash(comment)) for _, _, teacher, comment in accepted if comment_hash(comment))
+    assert max(per_pair.values()) == 1
+    assert max(per_client.values()) <= 5
+    assert max(per_network_pair.values()) <= 3
+    assert max(per_comment.values()) == 1
+    assert guard.accepted == len(accepted)
+    assert guard.accepted + guard.rejected == len(sessions) * 200
+
+
+def test_fresh_client_ids_do_not_escape_the_network_limits():
+    # A scripted client with a new cookie on every request
+    guard = SubmissionGuard(global_burst=1000)
+    accepted = run_sessions(guard, [(f"fresh {i}", "203.0.113.7") for i in range(200)], n_submissions=5)
+    assert len(accepted) <= 20
+    assert max(Counter(teacher for _, _, teacher, _ in accepted).values()) <= 3
+
+
+def test_global_burst_caps_everyone():
+    guard = SubmissionGuard(global_burst=30)
+    accepted = run_sessions(guard, [(f"client {c}", f"10.0.{c}.1") for c in range(50)], n_submissions=20)
+    assert len(accepted) == 30
+
+
+def test_a_rejected_submission_costs_nothing():
+    guard = SubmissionGuard(client_burst=2)
+    assert guard.check("alice", "teacher 1", "good", network_id="net")[0]
+    # Rejected for the duplicate comment, after the per-client and network checks passed
+    assert guard.check("alice", "teacher 2", "good", network_id="net")[0]
+    assert not guard.check("bob", "teacher 2", "Good!!", network_id="net")[0]
+    assert guard.per_client.retry_after("bob") == 0
+    assert guard.per_teacher.retry_after(("bob", "teacher 2")) == 0
+    assert guard.per_network_teacher.retry_after(("net", "teacher 2")) == 0
+    assert guard.check("bob", "teacher 2", "fine", network_id="net") == (True, None)
+
+    assert not guard.check("alice", "teacher 3", "", network_id="net")[0]  # alice's burst is spent
+    assert guard.check("carol", "teacher 3", "", network_id="net")[0]
+
+
+def test_tables_stay_within_max_keys():
+    guard = SubmissionGuard(global_burst=100_000, max_keys=50)
+    run_sessions(guard, [(f"client {c}", f"10.{c}.0.1") for c in range(200)], n_submissions=10)
+    for table in (guard.per_teacher, guard.per_client, guard.per_network_teacher, guard.per_network, guard.comments):
+        assert len(table) <= 50
+
+
+def test_token_bucket_refills():
+    bucket = TokenBucketLimiter(2, 0.5)
+    assert bucket.consume("k", now=0) and bucket.consume("k", now=0)
+    assert not bucket.consume("k", now=0)
+    assert bucket.retry_after("k", now=1) == 1
+    assert bucket.consume("k", now=2)
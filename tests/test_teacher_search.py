@@ -0,0 +1,68 @@
+import os
+import random
+
+import pytest
+
+from directory import load_directory
+from reviews import clean_name
+from teacher_search import TeacherSearchIndex, tokenize
+
+ROSTER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vitc.txt")
+
+
+@pytest.fixture(scope="module")
+def names(tmp_path_factory):
+    return load_directory(ROSTER, cache_dir=str(tmp_path_factory.mktemp("directory"))).cleaned
+
+
+@pytest.fixture(scope="module")
+def index(names):
+    return TeacherSearchIndex(names)
+
+
+def substring_matches(names, query):
+    # The old search, a linear scan for the query anywhere in the name, minus
+    # matches inside titles ("s" in "ms."): titles are not searchable
+    query = clean_name(query)
+    return {name_id for name_id, name in enumerate(names) if query in " ".join(tokenize(name))}
+
+
+@pytest.mark.parametrize("query", ["kumar", "raj", "priya", "brah", "ra", "a", "kumar s"])
+def test_finds_everything_the_substring_scan_found(names, index, query):
+    assert substring_matches(names, query) <= set(index.search(clean_name(query), limit=len(names)))
+
+
+def test_finds_every_infix_of_roster_names(names):
+    # Two-token queries like "a m" can spend the shared postings budget at the
+    # roster's size; with a budget to spare, nothing the old scan found is lost
+    index = TeacherSearchIndex(names, max_postings=100 * len(names))
+    rng = random.Random(0)
+    for _ in range(300):
+        name = " ".join(tokenize(rng.choice(names)))
+        start = rng.randrange(len(name))
+        query = name[start:start + rng.randint(2, 8)].strip()
+        if tokenize(query) == query.split():  # skip fragments that are title words, like "ms"
+            assert substring_matches(names, query) <= set(index.search(clean_name(query), limit=len(names))), query
+
+
+def test_whole_words_rank_above_infixes():
+    index = TeacherSearchIndex(["dr. rajakumar s", "dr. kumar r", "dr. sivakumar p"])
+    assert index.search("kumar")[0] == 1
+    assert set(index.search("kumar")) == {0, 1, 2}
+
+
+def test_typos_still_match():
+    index = TeacherSearchIndex(["dr. ganesan r", "dr. geetha s"])
+    assert index.search("ganeshan") == [0]
+
+
+def test_broad_queries_stay_within_the_postings_budget():
+    names = [f"dr. {word}{i} {chr(97 + i % 26)}" for i, word in enumerate(["ram", "kumar", "arun"] * 5000)]
+    index = TeacherSearchIndex(names, max_postings=500)
+    for query in ["a", "ra", "ar", "kumar", "ku ma"]:
+        for token in query.split():
+            candidates = index._candidate_tokens(token, " " in query, 500)
+            # Whole tokens only, so the last one may overshoot by its own postings
+            assert sum(len(index.postings[token]) for token, _ in candidates[:-1]) < 500
+        assert len(index.search(query)) == 25
+    assert index.search("a", limit=3) == [0, 26, 52]  # the exact initial "a" beats infixes
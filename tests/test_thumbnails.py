@@ -0,0 +1,105 @@
+import io
+import os
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from thumbnails import ThumbnailCache
+
+
+def jpeg(width, height):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 120, 40)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def photo_server():
+    # Stands in for the faculty photo host: /<width>x<height>.jpg is a photo of
+    # that size, anything else a 404. Counts requests per path.
+    hits = Counter()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] += 1
+            try:
+                width, height = map(int, self.path.strip("/").removesuffix(".jpg").split("x"))
+            except ValueError:
+                self.send_error(404)
+                return
+            body = jpeg(width, height)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    server.hits = hits
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_fetches_each_photo_once(tmp_path, photo_server):
+    cache = ThumbnailCache(str(tmp_path))
+    url = f"{photo_server.url}/400x600.jpg"
+    first = cache.get(url)
+    assert first is not None
+    assert cache.get(url) == first
+    assert ThumbnailCache(str(tmp_path)).get(url) == first  # from disk, after a restart
+    assert photo_server.hits["/400x600.jpg"] == 1
+
+
+def test_downscales_to_the_thumbnail_width(tmp_path, photo_server):
+    cache = ThumbnailCache(str(tmp_path), width=150)
+    with Image.open(io.BytesIO(cache.get(f"{photo_server.url}/600x800.jpg"))) as image:
+        assert image.size == (150, 200)
+        assert image.format == "JPEG"
+    with Image.open(io.BytesIO(cache.get(f"{photo_server.url}/100x80.jpg"))) as image:
+        assert image.size == (100, 80)  # never upscaled
+
+
+def test_evicts_least_recently_used(tmp_path, photo_server):
+    urls = [f"{photo_server.url}/{300 + i}x400.jpg" for i in range(4)]
+    cache = ThumbnailCache(str(tmp_path))
+    for i, url in enumerate(urls[:3]):
+        cache.get(url)
+        os.utime(cache._path(url), (1000 + i, 1000 + i))
+    cache.get(urls[0])  # a hit makes it the most recently used
+    size = os.path.getsize(cache._path(urls[0]))
+    cache.max_bytes = size * 3.5
+
+    cache.get(urls[3])
+    assert [os.path.exists(cache._path(url)) for url in urls] == [True, False, True, True]
+    assert cache.total_bytes <= cache.max_bytes
+
+
+def test_failed_fetches_back_off(tmp_path, photo_server):
+    cache = ThumbnailCache(str(tmp_path), retry_after=600)
+    url = f"{photo_server.url}/missing.jpg"
+    assert cache.get(url) is None
+    assert cache.get(url) is None
+    assert photo_server.hits["/missing.jpg"] == 1
+
+    cache.retry_after = 0
+    assert cache.get(url) is None
+    assert photo_server.hits["/missing.jpg"] == 2
+
+
+def test_prefetch_counts_cached_and_failed(tmp_path, photo_server):
+    cache = ThumbnailCache(str(tmp_path))
+    urls = [f"{photo_server.url}/200x200.jpg", f"{photo_server.url}/210x200.jpg", f"{photo_server.url}/nope.jpg"]
+    assert cache.prefetch(urls + urls[:1], workers=2) == (2, 1)
+    assert photo_server.hits["/200x200.jpg"] == 1
@@ -0,0 +1,78 @@
+import pytest
+
+from timetable_import import parse_import, parse_vtop_line, plan_import
+
+
+def entry(code, slots, faculty="", room="", name=""):
+    return {"course_code": code, "course_name": name, "faculty": faculty, "slots": slots, "room": room}
+
+
+@pytest.mark.parametrize("line, expected", [
+    # Tab separated, venue in the slot column
+    ("1\tBCSE302L - Database Systems - Embedded Theory\t3 0 0 0 3\tA1+TA1 - AB1-305\tRAJESH K - SCOPE\tRegistered",
+     entry("BCSE302L", "A1+TA1", "RAJESH K", "AB1-305", "Database Systems")),
+    # Pipe separated, venue in a column of its own
+    ("2 | BMAT201L - Complex Variables | B1+TB1 | AB1-206 | GEETHA S - SAS",
+     entry("BMAT201L", "B1+TB1", "GEETHA S", "AB1-206", "Complex Variables")),
+    # Separated by runs of spaces, a venue with a space in it
+    ("3  BPHY101P - Physics Lab  L31+L32  SJT 502  KUMAR R - SAS",
+     entry("BPHY101P", "L31+L32", "KUMAR R", "SJT 502", "Physics Lab")),
+    # No venue at all: the next column is the faculty
+    ("4\tBENG101L - English\tC1\tPRIYA M", entry("BENG101L", "C1", "PRIYA M", "", "English")),
+    ("5\tBCSE302P - Database Lab\tL15+L16 - AB1-L03\tRAJESH K - SCOPE",
+     entry("BCSE302P", "L15+L16", "RAJESH K", "AB1-L03", "Database Lab")),
+    # Not tabular: first course code and longest valid slot run anywhere
+    ("BCSE101E is in C2+TC2, not Z9+A1", entry("BCSE101E", "C2+TC2")),
+    ("no slots here", None),
+    ("", None),
+])
+def test_parse_vtop_line(line, expected):
+    assert parse_vtop_line(line) == expected
+
+
+def test_parse_import_reads_csv_with_aliased_headers():
+    text = ("Code, Title ,Faculty Name,Slot,Venue\n"
+            "CSE1001,Problem Solving,Dr. Ganesan R,A1+TA1,AB1-101\n"
+            ",,,,\n"
+            "MAT1001,Calculus,Dr. Geetha S,B1,AB1-102\n")
+    assert parse_import(text) == [
+        (2, entry("CSE1001", "A1+TA1", "Dr. Ganesan R", "AB1-101", "Problem Solving")),
+        (4, entry("MAT1001", "B1", "Dr. Geetha S", "AB1-102", "Calculus")),
+    ]
+
+
+def test_parse_import_reads_vtop_text_and_keeps_line_numbers():
+    text = "Sl.No\tCourse\tSlot\n\n1\tBCSE302L - Database Systems\tA1+TA1 - AB1-305\tRAJESH K\n"
+    assert parse_import(text) == [(3, entry("BCSE302L", "A1+TA1", "RAJESH K", "AB1-305", "Database Systems"))]
+
+
+def test_plan_import_reports_both_sides_of_a_clash():
+    existing = [entry("PHY1001", "G1", "Dr. Kumar R")]
+    entries = [entry("CSE1001", "A1+TA1"), entry("CSE1002", "L1+L2"), entry("MAT1001", "B1")]
+    timetable, faculty_list, problems = plan_import(entries, existing)
+
+    assert problems[0] == ["A1 clashes with L1 of CSE1002 on MON"]
+    assert problems[1] == ["L1 clashes with A1 of CSE1001 on MON"]
+    assert problems[2] == []
+    assert faculty_list == existing + [entries[2]]
+    assert faculty_list[0] is existing[0]
+    assert existing == [entry("PHY1001", "G1", "Dr. Kumar R")]
+    assert {cell["course_code"] for cell in timetable.values() if cell} == {"PHY1001", "MAT1001"}
+
+
+def test_plan_import_checks_against_the_timetable_unless_replacing():
+    existing = [entry("CSE1001", "A1")]
+    entries = [entry("CSE1002", "L1"), entry("CSE1003", "Z9"), entry("CSE1004", "")]
+    _, faculty_list, problems = plan_import(entries, existing)
+    assert problems == [["L1 clashes with A1 of CSE1001 (already in the timetable) on MON"],
+                        ["invalid slot Z9"], ["no slots"]]
+    assert faculty_list == existing
+
+    _, faculty_list, problems = plan_import(entries[:1], existing, replace=True)
+    assert problems == [[]]
+    assert faculty_list == [entries[0]]
+
+
+def test_a_slot_repeated_within_an_entry_is_reported():
+    _, _, problems = plan_import([entry("CSE1001", "A1+A1")])
+    assert problems == [["A1 clashes with another slot of the same course"]]
@@ -0,0 +1,34 @@
+import io
+import multiprocessing
+import zipfile
+
+from timetable_render import batch_export_zip
+
+
+def entry(slots="A1"):
+    return {"course_code": "CSE1001", "course_name": "Problem Solving", "faculty": "Dr. Ganesan R", "slots": slots,
+            "room": "AB1-101"}
+
+
+def test_students_whose_names_sanitize_alike_get_separate_pdfs():
+    students = {"A B": [entry()], "A_B": [entry("B1")], "a/b": [entry("C1")]}
+    out = io.BytesIO()
+    assert batch_export_zip(students, out) == {student: [] for student in students}
+    names = zipfile.ZipFile(out).namelist()
+    assert names == ["A_B.pdf", "A_B-2.pdf", "a_b-3.pdf"]
+
+
+def test_clashing_entries_are_reported_per_student():
+    out = io.BytesIO()
+    report = batch_export_zip({"21BCE1001": [entry("A1"), entry("A1+TA1")]}, out, workers=1)
+    assert len(report["21BCE1001"]) == 1
+    assert zipfile.ZipFile(out).namelist() == ["21BCE1001.pdf"]
+
+
+def test_spawned_workers_write_the_same_zip():
+    students = {f"21BCE{i:04d}": [entry(slots)] for i, slots in enumerate(["A1", "B1+TB1", "L1+L2", "C1"] * 5)}
+    spawned, in_process = io.BytesIO(), io.BytesIO()
+    report = batch_export_zip(students, spawned, workers=2, mp_context=multiprocessing.get_context("spawn"))
+    assert report == batch_export_zip(students, in_process, workers=1)
+    spawned, in_process = zipfile.ZipFile(spawned), zipfile.ZipFile(in_process)
+    assert sorted(spawned.namelist()) == sorted(in_process.namelist()) == sorted(f"{s}.pdf" for s in students)
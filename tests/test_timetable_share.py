@@ -0,0 +1,95 @@
+import base64
+import zlib
+
+import pytest
+
+from timetable_share import LAYOUT_ID, SHARE_SLOTS, SHARE_VERSION, _write_varint, decode_share, encode_timetable, load_shared
+
+
+def course(code, faculty, slots, room, name=""):
+    return {"course_code": code, "course_name": name, "faculty": faculty, "slots": slots, "room": room}
+
+
+FACULTY_LIST = [
+    course("CSE1001", "Dr. Ganesan R", "A1+TA1", "AB1-101", "Problem Solving"),
+    course("MAT1001", "Dr. Ganesan R", "B1", "AB1-101", "Calculus"),
+    course("ENG1001", "Dr. Zoë Pérez", "C1", "", "English – Ünïcödé 📘"),
+    course("PHY1001", "", "", "AB2-001"),
+]
+
+
+def token_for(body, version=SHARE_VERSION, layout=LAYOUT_ID):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    packed = bytes([version]) + layout + compressor.compress(bytes(body)) + compressor.flush()
+    return base64.urlsafe_b64encode(packed).rstrip(b"=").decode("ascii")
+
+
+def body(strings, entries):
+    out = bytearray()
+    _write_varint(out, len(strings))
+    for text in strings:
+        data = text.encode("utf-8")
+        _write_varint(out, len(data))
+        out += data
+    _write_varint(out, len(entries))
+    for indices, bits in entries:
+        for index in indices:
+            _write_varint(out, index)
+        _write_varint(out, bits)
+    return out
+
+
+def test_round_trip():
+    timetable, faculty_list = load_shared(encode_timetable(FACULTY_LIST))
+    assert faculty_list == FACULTY_LIST
+    assert timetable[("MON", 0)] is faculty_list[0]  # A1
+    filled = {id(entry) for entry in timetable.values() if entry}
+    assert filled == {id(entry) for entry in faculty_list[:3]}
+
+
+def test_slots_come_back_in_natural_order():
+    _, faculty_list = load_shared(encode_timetable([course("CSE1001", "x", "TA1+L10+A1+L2", "")]))
+    assert faculty_list[0]["slots"] == "A1+L2+L10+TA1"
+
+
+def test_empty_timetable():
+    token = encode_timetable([])
+    assert decode_share(token) == ((), ())
+    timetable, faculty_list = load_shared(token)
+    assert faculty_list == [] and not any(timetable.values())
+
+
+def test_unknown_slot_cannot_be_encoded():
+    with pytest.raises(ValueError):
+        encode_timetable([course("CSE1001", "x", "A1+Z9", "")])
+
+
+@pytest.mark.parametrize("token", [
+    token_for(body(["a"], []), version=SHARE_VERSION + 1),
+    token_for(body(["a"], []), layout=bytes(b ^ 0xFF for b in LAYOUT_ID)),
+    encode_timetable(FACULTY_LIST)[:-12],  # truncated deflate stream
+    token_for(body(["a"], [([0, 0, 0, 0], 1)])[:-3]),  # truncated body
+    token_for(body(["abc"], [])[:3]),  # string runs past the body
+    token_for(body(["a"], [([0, 0, 5, 0], 1)])),  # string index out of range
+    token_for(body(["a"], [([0, 0, 0, 0], 1 << len(SHARE_SLOTS))])),  # slot bit outside the layout
+    token_for(b"\x01\x02\xff\xfe"),  # not utf-8
+    "AQ",  # too short for a header
+    "not base64!",
+])
+def test_bad_tokens_raise_value_error(token):
+    with pytest.raises(ValueError):
+        decode_share(token)
+
+
+def test_memoized_loads_are_independent():
+    token = encode_timetable(FACULTY_LIST)
+    hits = decode_share.cache_info().hits
+    first_timetable, first_list = load_shared(token)
+    first_list[0]["room"] = "changed"
+    first_timetable[("TUE", 3)] = first_list[1]
+
+    timetable, faculty_list = load_shared(token)
+    assert decode_share.cache_info().hits > hits
+    assert faculty_list == FACULTY_LIST
+    assert faculty_list[0] is not first_list[0]
+    assert timetable[("TUE", 3)] is None or timetable[("TUE", 3)] is not first_list[1]
@@ -0,0 +1,78 @@
+import itertools
+import random
+
+import pytest
+
+from timetable_solver import DEFAULT_WEIGHTS, parse_course_options, prepare_option, solve
+
+# A small pool so that random instances clash often; Z9 is invalid, A1+L1 clashes with itself
+SLOT_POOL = ["A1", "A1+TA1", "B1", "B1+TB1", "C1", "L1+L2", "L3+L4", "L31+L32", "F1", "G1+TG1", "A2", "TA1", "Z9", "A1+L1"]
+
+
+def random_instance(rng):
+    courses = [
+        {"course_code": f"C{c}", "options": [{"faculty": f"F{c}_{o}", "slots": rng.choice(SLOT_POOL)} for o in range(rng.randint(1, 4))]}
+        for c in range(rng.randint(1, 5))
+    ]
+    ratings = {opt["faculty"]: rng.choice([None, 0, rng.randint(0, 10), rng.uniform(0, 10)]) for course in courses for opt in course["options"]}
+    weights = {name: rng.choice([0, 0.5, 1, 3]) for name in DEFAULT_WEIGHTS}
+    return courses, ratings, weights
+
+
+def cost_of(courses, choices, ratings, weights):
+    # None if the choices clash or use an invalid option
+    used = day_mask = early = 0
+    rating = 0.0
+    for course, choice in zip(courses, choices):
+        option = course["options"][choice]
+        parsed = prepare_option(option["slots"])
+        if parsed is None or used & parsed[0]:
+            return None
+        used |= parsed[0]
+        day_mask |= parsed[1]
+        early += parsed[2]
+        rating += ratings.get(option["faculty"]) or 0.0
+    weights = dict(DEFAULT_WEIGHTS, **weights)
+    return weights["early"] * early + weights["days"] * bin(day_mask).count("1") - weights["rating"] * rating / len(courses)
+
+
+def exhaustive_costs(courses, ratings, weights):
+    costs = (cost_of(courses, choices, ratings, weights) for choices in itertools.product(*(range(len(c["options"])) for c in courses)))
+    return sorted(cost for cost in costs if cost is not None)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_top_k_matches_exhaustive_enumeration(seed):
+    rng = random.Random(seed)
+    courses, ratings, weights = random_instance(rng)
+    top_k = rng.randint(1, 6)
+    solutions, complete = solve(courses, faculty_rating=ratings.get, weights=weights, top_k=top_k)
+
+    assert complete
+    assert [s["cost"] for s in solutions] == pytest.approx(exhaustive_costs(courses, ratings, weights)[:top_k])
+    for solution in solutions:
+        assert cost_of(courses, solution["choices"], ratings, weights) == pytest.approx(solution["cost"])
+    assert len({tuple(s["choices"]) for s in solutions}) == len(solutions)
+
+
+def test_no_solution():
+    courses = parse_course_options("CSE1001 | X | A1\nMAT1001 | Y | A1+TA1\nPHY1001 | Z | Z9")
+    assert solve(courses) == ([], True)
+    assert solve(courses[:2]) == ([], True)  # every combination clashes
+    assert solve([]) == ([], True)
+
+
+def test_max_nodes_cuts_the_search_short():
+    pool = ["A1+TA1", "B1+TB1", "C1+TC1", "D1+TD1", "E1+TE1", "F1+TF1", "G1+TG1", "A2+TA2", "B2+TB2", "C2+TC2"]
+    courses = [
+        {"course_code": f"C{c}", "options": [{"faculty": f"F{c}_{o}", "slots": pool[(c + o) % len(pool)]} for o in range(6)]}
+        for c in range(8)
+    ]
+    solutions, complete = solve(courses, max_nodes=20)
+    assert not complete
+    assert len(solutions) <= 5
+    for solution in solutions:
+        assert cost_of(courses, solution["choices"], {}, {}) == pytest.approx(solution["cost"])
+
+    solutions, complete = solve(courses)
+    assert complete and solutions
@@ -0,0 +1,61 @@
+import pytest
+
+from timetable_store import TimetableStore
+
+
+def course(code, faculty, slots, room):
+    return {"course_code": code, "course_name": "", "faculty": faculty, "slots": slots, "room": room}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TimetableStore(str(tmp_path / "timetables.db"))
+
+
+def test_saving_again_replaces_the_owners_timetable(store):
+    store.save("alice", [course("CSE1001", "Dr. Ganesan R", "A1+TA1", "AB1-101")])
+    store.save("bob", [course("CSE1001", "Dr. Ganesan R", "A1", "AB1-101")])
+    store.save("alice", [course("MAT1001", "Dr. Geetha S", "B1", "AB1-102")])
+
+    assert store.count() == 2
+    assert store.faculty_students("Dr. Ganesan R") == 1
+    assert store.faculty_students("Dr. Geetha S", "mat1001") == 1
+
+
+def test_saving_nothing_or_deleting_removes_only_that_owner(store):
+    store.save("alice", [course("CSE1001", "Dr. Ganesan R", "A1", "AB1-101")])
+    store.save("bob", [course("CSE1001", "Dr. Ganesan R", "A1", "AB1-101")])
+    store.delete("alice")
+    assert store.count() == 1
+    assert store.save("bob", []) is None
+    assert store.count() == 0
+    assert store.faculty_for("CSE1001", "A1") == []
+
+
+def test_faculty_for_counts_students_per_faculty(store):
+    store.save("alice", [course("cse1001", "Dr. Ganesan R", "A1+TA1", "AB1-101")])
+    store.save("bob", [course("CSE1001", "Dr. Ganesan R", "A1", "AB1-102")])
+    store.save("carol", [course("CSE1001", "Dr. Geetha S", "A1", "AB1-103")])
+    store.save("dave", [course("CSE1001", "Dr. Geetha S", "B1", "AB1-104")])
+
+    assert store.faculty_for("CSE1001", "a1") == [("Dr. Ganesan R", 2), ("Dr. Geetha S", 1)]
+    assert store.faculty_for("CSE1001", "TA1") == [("Dr. Ganesan R", 1)]
+    assert store.faculty_students("Dr. Geetha S", "CSE1001") == 2
+
+
+def test_free_rooms_are_known_rooms_nobody_uses_in_the_slot(store):
+    store.save("alice", [course("CSE1001", "Dr. Ganesan R", "A1", "ab1-101")])
+    store.save("bob", [course("MAT1001", "Dr. Geetha S", "B1", "AB1-102")])
+    store.save("carol", [course("PHY1001", "Dr. Kumar R", "L1", "AB1-103")])  # L1 meets in A1's Monday cell
+
+    assert store.occupied_rooms("A1") == {"AB1-101", "AB1-103"}
+    assert store.free_rooms("A1") == ["AB1-102"]
+    assert store.free_rooms("A1", "WED") == ["AB1-102", "AB1-103"]
+    assert store.free_rooms("Z9") == ["AB1-101", "AB1-102", "AB1-103"]
+
+
+def test_unknown_slots_are_kept_without_occupancy(store):
+    store.save("alice", [course("CSE1001", "Dr. Ganesan R", "Z9+A1", "AB1-101")])
+    assert store.faculty_students("Dr. Ganesan R") == 1
+    assert store.faculty_for("CSE1001", "Z9") == []
+    assert store.faculty_for("CSE1001", "A1") == [("Dr. Ganesan R", 1)]
@@ -0,0 +1,124 @@
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+THUMBNAIL_DIR = os.path.join(".cache", "thumbnails")
+THUMBNAIL_WIDTH = 150
+USER_AGENT = "vitc-teacher-review/1.0 (thumbnail cache)"
+
+
+def url_key(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def make_thumbnail(data, width=THUMBNAIL_WIDTH):
+    image = Image.open(io.BytesIO(data))
+    image.thumbnail((width, width * 4))
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=85, optimize=True)
+    return out.getvalue()
+
+
+class ThumbnailCache:
+    # Faculty photos fetched once, shrunk to THUMBNAIL_WIDTH and kept on disk,
+    # keyed by URL hash. File mtimes double as the LRU clock: a hit touches the
+    # file and eviction removes the least recently used files first.
+    def __init__(self, cache_dir=THUMBNAIL_DIR, max_bytes=64 * 1024 * 1024, width=THUMBNAIL_WIDTH, timeout=10,
+                 retry_after=600):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.width = width
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._failed = {}  # url -> time of the last failed fetch
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.total_bytes = sum(entry.stat().st_size for entry in os.scandir(cache_dir) if entry.is_file())
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, url_key(url) + ".jpg")
+
+    def fetch(self, url):
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return response.read()
+
+    def get(self, url):
+        # Thumbnail bytes, or None when the photo cannot be fetched or decoded
+        path = self._path(url)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            pass
+        failed_at = self._failed.get(url)
+        if failed_at is not None and time.monotonic() - failed_at < self.retry_after:
+            return None
+        try:
+            data = make_thumbnail(self.fetch(url), self.width)
+        except Exception:
+            self._failed[url] = time.monotonic()
+            return None
+        self._failed.pop(url, None)
+        self._store(path, data)
+        return data
+
+    def _store(self, path, data):
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        with self._lock:
+            existed = os.path.exists(path)
+            os.replace(tmp, path)
+            if not existed:
+                self.total_bytes += len(data)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted(
+            (entry for entry in os.scandir(self.cache_dir) if entry.is_file() and entry.name.endswith(".jpg")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        total = sum(entry.stat().st_size for entry in entries)
+        # Trim to 90% so we don't evict again on the very next insert
+        for entry in entries:
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        self.total_bytes = total
+
+    def prefetch(self, urls, workers=8):
+        # Warm the cache; returns (cached, failed) counts
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(self.get, urls))
+        failed = sum(1 for data in results if data is None)
+        return len(results) - failed, failed
+
+
+if __name__ == "__main__":
+    # python thumbnails.py prefetch [roster file]
+    if len(sys.argv) < 2 or sys.argv[1] != "prefetch":
+        sys.exit("usage: python thumbnails.py prefetch [vitc.txt]")
+    from directory import iter_teachers
+
+    roster = sys.argv[2] if len(sys.argv) > 2 else "vitc.txt"
+    cached, failed = ThumbnailCache().prefetch(url for _, url in iter_teachers(roster))
+    print(f"{cached} thumbnails cached, {failed} failed")
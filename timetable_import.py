@@ -0,0 +1,153 @@
+import csv
+import io
+import re
+
+from slots import cell_to_slots, clash_days, parse_slots, slot_mask, slot_to_cells
+from timetable_render import FACULTY_FIELDS
+
+# Bulk import of timetable entries, from a CSV or from the registered-courses
+# table copied out of VTOP. Every row is checked against the slot model, the
+# current timetable and every other imported row in one pass, so all problems
+# are reported together and the clean rows can be applied in one go.
+
+_CSV_ALIASES = {
+    "code": "course_code", "course": "course_code",
+    "title": "course_name", "course_title": "course_name",
+    "faculty_name": "faculty", "faculty_details": "faculty",
+    "slot": "slots", "venue": "room",
+}
+_COURSE_CODE_RE = re.compile(r'\b([A-Z]{3,4}\d{3,4}[A-Z]?)\b')
+_COURSE_FIELD_RE = re.compile(r'^(?:\d+\s+)?([A-Z]{3,4}\d{3,4}[A-Z]?)$')  # optionally after the serial number
+_VENUE_RE = re.compile(r'^[A-Za-z]{1,5}\d*[-\s]?\d+[A-Za-z]?$')  # AB1-305, SJT 502, TT101
+_SLOT_LIST_RE = re.compile(r'\b([A-Z]{1,3}\d{1,2}(?:\s*\+\s*[A-Z]{1,3}\d{1,2})*)\b')
+_FIELD_SPLIT_RE = re.compile(r'\t|\s*\|\s*|\s{2,}')
+
+
+def _slot_list(text):
+    # The longest run of A1+TA1-style tokens in text that are all real slots
+    best = ""
+    for match in _SLOT_LIST_RE.finditer(text):
+        slots = parse_slots(match.group(1))
+        if all(slot in slot_to_cells for slot in slots) and len(slots) > len(parse_slots(best)):
+            best = "+".join(slots)
+    return best
+
+
+def parse_import_csv(text):
+    # Header row naming some of course_code, course_name, faculty, slots, room
+    # (a few common spellings are accepted). Returns [(line, entry), ...].
+    rows = []
+    reader = csv.DictReader(io.StringIO(text))
+    for row in reader:
+        row = {(key or "").strip().lower().replace(" ", "_"): (value or "").strip() for key, value in row.items()}
+        row = {_CSV_ALIASES.get(key, key): value for key, value in row.items()}
+        if any(row.values()):
+            rows.append((reader.line_num, {field: row.get(field, "") for field in FACULTY_FIELDS}))
+    return rows
+
+
+def parse_vtop_line(line):
+    # One row of VTOP's registered courses table, e.g. (tab separated)
+    #   1  BCSE302L - Database Systems - Embedded Theory  3 0 0 0 3  ...  A1+TA1 - AB1-305  RAJESH K - SCOPE  ...
+    # Returns an entry, or None if the line has no slots.
+    fields = [field.strip() for field in _FIELD_SPLIT_RE.split(line) if field.strip()]
+    entry = dict.fromkeys(FACULTY_FIELDS, "")
+    for i, field in enumerate(fields):
+        parts = [part.strip() for part in field.split(" - ")]
+        code = _COURSE_FIELD_RE.match(parts[0])
+        if not entry["course_code"] and code:
+            entry["course_code"] = code.group(1)
+            entry["course_name"] = parts[1] if len(parts) > 1 else ""
+        elif not entry["slots"] and _slot_list(parts[0]) and _slot_list(parts[0]) == "+".join(parse_slots(parts[0])):
+            entry["slots"] = _slot_list(parts[0])
+            entry["room"] = parts[1] if len(parts) > 1 else ""
+            following = fields[i + 1:i + 3]
+            if not entry["room"] and following and _VENUE_RE.match(following[0]):
+                entry["room"] = following.pop(0)
+            # Faculty details follow the slot / venue column
+            if following and not _slot_list(following[0]):
+                entry["faculty"] = following[0].split(" - ")[0].strip()
+    if not entry["slots"]:
+        # Not tabular: fall back to the first course code and slot list anywhere in the line
+        entry["slots"] = _slot_list(line)
+        code = _COURSE_CODE_RE.search(line)
+        entry["course_code"] = entry["course_code"] or (code.group(1) if code else "")
+    return entry if entry["slots"] else None
+
+
+def parse_import(text):
+    # CSV if the first line is a header mentioning slots, VTOP text otherwise.
+    # Returns [(line number, entry), ...]; lines without slots are dropped.
+    lines = text.splitlines()
+    first = next((line for line in lines if line.strip()), "")
+    if "," in first and "slot" in first.lower():
+        return parse_import_csv(text)
+    rows = []
+    for number, line in enumerate(lines, 1):
+        entry = parse_vtop_line(line) if line.strip() else None
+        if entry:
+            rows.append((number, entry))
+    return rows
+
+
+def _entry_label(entry):
+    return entry.get("course_code") or f"the {entry['slots']} entry"
+
+
+def plan_import(entries, faculty_list=(), replace=False):
+    # Checks every entry against the slot model, the current faculty_list
+    # (unless replace) and every other entry. Returns (timetable, faculty_list,
+    # problems): the timetable and faculty list with all clean entries added,
+    # and problems[i], the list of problems that kept entries[i] out.
+    kept = [] if replace else list(faculty_list)
+    kept_slots = [parse_slots(entry["slots"]) for entry in kept]
+    kept_mask = 0
+    for slots in kept_slots:
+        for slot in slots:
+            kept_mask |= slot_mask.get(slot, 0)
+
+    problems = [[] for _ in entries]
+    slot_lists = []
+    masks = []
+    for i, entry in enumerate(entries):
+        slots = parse_slots(entry["slots"])
+        slot_lists.append(slots)
+        mask = 0
+        for slot in slots:
+            if slot not in slot_to_cells:
+                problems[i].append(f"invalid slot {slot}")
+            elif mask & slot_mask[slot]:
+                problems[i].append(f"{slot} clashes with another slot of the same course")
+            else:
+                mask |= slot_mask[slot]
+        if not slots:
+            problems[i].append("no slots")
+        masks.append(mask)
+        if mask & kept_mask:
+            for other, other_slots in zip(kept, kept_slots):
+                for slot in slots:
+                    for other_slot in other_slots:
+                        if slot in slot_mask and other_slot in slot_mask and slot_mask[slot] & slot_mask[other_slot]:
+                            problems[i].append(f"{slot} clashes with {other_slot} of {_entry_label(other)} "
+                                               f"(already in the timetable) on {', '.join(clash_days(slot, other_slot))}")
+
+    # Imported rows against each other: one AND per pair, slot detail only on a hit
+    for i in range(len(entries)):
+        for j in range(i + 1, len(entries)):
+            if masks[i] & masks[j]:
+                for slot in slot_lists[i]:
+                    for other_slot in slot_lists[j]:
+                        if slot in slot_mask and other_slot in slot_mask and slot_mask[slot] & slot_mask[other_slot]:
+                            days = ', '.join(clash_days(slot, other_slot))
+                            problems[i].append(f"{slot} clashes with {other_slot} of {_entry_label(entries[j])} on {days}")
+                            problems[j].append(f"{other_slot} clashes with {slot} of {_entry_label(entries[i])} on {days}")
+
+    new_faculty_list = kept + [
+        {field: entry.get(field, "") for field in FACULTY_FIELDS} for entry, found in zip(entries, problems) if not found
+    ]
+    timetable = dict.fromkeys(cell_to_slots)
+    for entry in new_faculty_list:
+        for slot in parse_slots(entry["slots"]):
+            for cell in slot_to_cells.get(slot, ()):
+                timetable[cell] = entry
+    return timetable, new_faculty_list, problems
@@ -0,0 +1,351 @@
+import csv
+import functools
+import hashlib
+import html
+import io
+import json
+import os
+import sys
+import threading
+import zipfile
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from slots import days, timetableData, theory_times, lab_times, slot_is_lab, slot_to_cells, cell_to_slots, parse_slots, find_clashes
+
+# One rendered cell of the timetable grid. kind is "lunch", "empty" or "filled";
+# lines are the text lines of a filled cell (slot label, course code, room).
+CellView = namedtuple("CellView", ["kind", "label", "is_lab", "lines"])
+
+
+def entry_key(entry):
+    # The parts of a timetable entry a cell shows; doubles as the entry's version
+    # for the render caches, so an unchanged entry never re-renders its cells
+    if not entry:
+        return None
+    return (entry["course_code"], entry["room"], entry["slots"])
+
+
+@functools.lru_cache(maxsize=None)
+def _entry_slots(slot_str):
+    return frozenset(parse_slots(slot_str))
+
+
+@functools.lru_cache(maxsize=4096)
+def cell_view(day, period, key):
+    slots = timetableData[day][period] if period < len(timetableData[day]) else ()
+    slot_label = " / ".join([s for s in slots if s])
+    if not slot_label:
+        return CellView("lunch", "LUNCH", False, ())
+    if key is None:
+        return CellView("empty", slot_label, False, ())
+    course_code, room, slot_str = key
+    taken = _entry_slots(slot_str)
+    # Red (lab) only when the entry actually took this cell's lab slot
+    is_lab = any(slot_is_lab.get(s, False) and s in taken for s in slots if s)
+    return CellView("filled", slot_label, is_lab, (slot_label, course_code, room))
+
+
+def timetable_grid(timetable):
+    # [(day, [CellView, ...]), ...]; shared by the HTML preview and the PDF export
+    return [
+        (day, [cell_view(day, period, entry_key(timetable.get((day, period)))) for period in range(len(theory_times))])
+        for day in days
+    ]
+
+
+# --- HTML preview ---
+HEADER_HTML = (
+    '<tr><th class="period-label" rowspan="2">DAY</th>'
+    + ''.join(f'<th class="theory-time">{t}</th>' for t in theory_times)
+    + '</tr><tr>'
+    + ''.join(f'<th class="lab-time">{t}</th>' for t in lab_times)
+    + '</tr>'
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def cell_html(view):
+    if view.kind == "lunch":
+        return '<td class="lunch">LUNCH</td>'
+    if view.kind == "empty":
+        return f'<td class="empty">{view.label}</td>'
+    cell_class = "red" if view.is_lab else "green"
+    # Only show course code and room number
+    return f'<td class="{cell_class}">{"<br>".join(html.escape(line) for line in view.lines)}</td>'
+
+
+def render_timetable_html(timetable):
+    parts = ['<table class="ffcs-table">', HEADER_HTML]
+    for day, views in timetable_grid(timetable):
+        parts.append(f'<tr><td class="period-label">{day}</td>')
+        parts.extend(cell_html(view) for view in views)
+        parts.append('</tr>')
+    parts.append('</table>')
+    return ''.join(parts)
+
+
+# --- PDF export ---
+def _header_lines(header):
+    if 'to' in header:
+        t1, t2 = header.split(' to ')
+        return f"{t1.strip()}\nto\n{t2.strip()}"
+    return header
+
+
+def new_pdf():
+    # fpdf is only imported once a PDF is actually needed
+    from fpdf import FPDF
+
+    # Use mm for A4 sizing
+    return FPDF(orientation='L', unit='mm', format='A4')
+
+
+def draw_timetable_page(pdf, timetable, faculty_list, title="FFCS Faculty Timetable"):
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 10, title, ln=True, align="C")
+    pdf.ln(2)
+    n_cols = len(theory_times)
+    margin = 10
+    table_width = 297 - 2 * margin
+    cell_w = table_width / (n_cols + 1)  # +1 for DAY column
+    cell_h = 14  # Slightly taller for readability
+    # --- Header: Theory times ---
+    pdf.set_x(margin)
+    pdf.set_font("Arial", size=6)
+    pdf.set_fill_color(235, 235, 235)  # Very light gray for DAY header
+    pdf.cell(cell_w, cell_h, "DAY", border=1, align='C', fill=True)
+    pdf.set_fill_color(191, 202, 252)  # Light blue for theory header
+    for i in range(n_cols):
+        x = pdf.get_x()
+        y = pdf.get_y()
+        pdf.multi_cell(cell_w, cell_h / 3, _header_lines(theory_times[i]), border=1, align='C', fill=True)
+        pdf.set_xy(x + cell_w, y)
+    pdf.ln(cell_h)
+    # --- Header: Lab times ---
+    pdf.set_x(margin)
+    pdf.set_fill_color(220, 230, 250)  # Lighter blue for lab header
+    pdf.cell(cell_w, cell_h, "", border=1, align='C', fill=True)
+    for i in range(n_cols):
+        x = pdf.get_x()
+        y = pdf.get_y()
+        pdf.multi_cell(cell_w, cell_h / 3, _header_lines(lab_times[i]), border=1, align='C', fill=True)
+        pdf.set_xy(x + cell_w, y)
+    pdf.ln(cell_h)
+    pdf.set_font("Arial", size=7)
+    # --- Rows for each day ---
+    for day, views in timetable_grid(timetable):
+        pdf.set_x(margin)
+        pdf.set_fill_color(235, 235, 235)  # Very light gray for day cells
+        pdf.cell(cell_w, cell_h, day, border=1, align='C', fill=True)
+        for view in views:
+            if view.kind == "lunch":
+                pdf.set_fill_color(235, 235, 235)  # Very light gray for lunch
+                pdf.cell(cell_w, cell_h, "LUNCH", border=1, align='C', fill=True)
+            elif view.kind == "filled":
+                if view.is_lab:
+                    pdf.set_fill_color(231, 76, 60)
+                else:
+                    pdf.set_fill_color(46, 204, 64)
+                x = pdf.get_x()
+                y = pdf.get_y()
+                # Use multi_cell for filled cells, but keep height fixed
+                pdf.multi_cell(cell_w, cell_h / 3, '\n'.join(view.lines), border=1, align='C', fill=True)
+                # Move cursor to the right of the cell
+                pdf.set_xy(x + cell_w, y)
+            else:
+                pdf.set_fill_color(255, 255, 255)  # White for empty cells
+                pdf.cell(cell_w, cell_h, view.label, border=1, align='C', fill=True)
+        pdf.ln(cell_h)
+    # Faculty List Table
+    pdf.ln(5)
+    pdf.set_font("Arial", size=8)
+    pdf.set_x(margin)
+    pdf.cell(0, 8, "Faculty List", ln=True, align="L")
+    pdf.set_x(margin)
+    headers = ["Course Code", "Course Name", "Faculty", "Slots", "Room"]
+    col_widths = [30, 45, 45, 45, 30]
+    for i, h in enumerate(headers):
+        pdf.set_fill_color(191, 202, 252)
+        pdf.cell(col_widths[i], 8, h, border=1, align='C', fill=True)
+    pdf.ln(8)
+    for entry in faculty_list:
+        pdf.set_x(margin)
+        pdf.set_fill_color(255, 255, 255)
+        pdf.cell(col_widths[0], 8, entry["course_code"], border=1, align='C', fill=True)
+        pdf.cell(col_widths[1], 8, entry["course_name"], border=1, align='C', fill=True)
+        pdf.cell(col_widths[2], 8, entry["faculty"], border=1, align='C', fill=True)
+        pdf.cell(col_widths[3], 8, entry["slots"], border=1, align='C', fill=True)
+        pdf.cell(col_widths[4], 8, entry["room"], border=1, align='C', fill=True)
+        pdf.ln(8)
+
+
+def export_pdf(timetable, faculty_list, title="FFCS Faculty Timetable"):
+    pdf = new_pdf()
+    draw_timetable_page(pdf, timetable, faculty_list, title)
+    return pdf.output(dest="S").encode("latin1")
+
+
+# Repeated downloads of an unchanged timetable reuse the bytes from last time
+FACULTY_FIELDS = ["course_code", "course_name", "faculty", "slots", "room"]
+PDF_CACHE_SIZE = 256
+_pdf_cache = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+PdfCacheInfo = namedtuple("PdfCacheInfo", ["hits", "misses", "currsize"])
+_pdf_cache_hits = 0
+_pdf_cache_misses = 0
+
+
+def timetable_fingerprint(timetable, faculty_list):
+    cells = sorted((day, period, entry_key(entry)) for (day, period), entry in timetable.items() if entry)
+    rows = [[entry.get(field, "") for field in FACULTY_FIELDS] for entry in faculty_list]
+    return hashlib.sha256(json.dumps([cells, rows]).encode("utf-8")).hexdigest()
+
+
+def pdf_cache_info():
+    return PdfCacheInfo(_pdf_cache_hits, _pdf_cache_misses, len(_pdf_cache))
+
+
+def export_pdf_cached(timetable, faculty_list):
+    global _pdf_cache_hits, _pdf_cache_misses
+    key = timetable_fingerprint(timetable, faculty_list)
+    with _pdf_cache_lock:
+        if key in _pdf_cache:
+            _pdf_cache_hits += 1
+            _pdf_cache.move_to_end(key)
+            return _pdf_cache[key]
+    pdf_bytes = export_pdf(timetable, faculty_list)
+    with _pdf_cache_lock:
+        _pdf_cache_misses += 1
+        _pdf_cache[key] = pdf_bytes
+        while len(_pdf_cache) > PDF_CACHE_SIZE:
+            _pdf_cache.popitem(last=False)
+    return pdf_bytes
+
+
+# --- Batch export ---
+def build_timetable(entries):
+    # Places faculty entries on an empty grid in order. Returns
+    # (timetable, faculty_list, errors); entries that are invalid or clash with
+    # an earlier entry are skipped and reported in errors.
+    timetable = dict.fromkeys(cell_to_slots)
+    faculty_list = []
+    taken_slots = []
+    errors = []
+    for entry in entries:
+        slots = parse_slots(entry["slots"])
+        invalid, input_clashes, timetable_clashes = find_clashes(slots, taken_slots)
+        if not slots or invalid or input_clashes or timetable_clashes:
+            problems = [f"invalid slot {slot}" for slot in invalid]
+            problems += [f"{slot} clashes with {other}" for slot, other, _ in input_clashes + timetable_clashes]
+            errors.append(f"{entry.get('course_code') or entry['slots']}: {', '.join(problems) or 'no slots'}")
+            continue
+        entry = {field: entry.get(field, "") for field in FACULTY_FIELDS}
+        for slot in slots:
+            for cell in slot_to_cells[slot]:
+                timetable[cell] = entry
+        taken_slots.extend(slots)
+        faculty_list.append(entry)
+    return timetable, faculty_list, errors
+
+
+def read_batch_csv(text):
+    # CSV with a student column (student / reg_no / name) and a slots column;
+    # course_code, course_name, faculty and room are optional. One row per
+    # course, or per student with all slots in one cell (e.g. A1+TA1+L1+L2).
+    # Returns {student: [entry, ...]} in file order.
+    reader = csv.DictReader(io.StringIO(text))
+    students = {}
+    for row in reader:
+        row = {(key or "").strip().lower().replace(" ", "_"): (value or "").strip() for key, value in row.items()}
+        student = row.get("student") or row.get("reg_no") or row.get("name") or "student"
+        if not row.get("slots"):
+            continue
+        students.setdefault(student, []).append({field: row.get(field, "") for field in FACULTY_FIELDS})
+    return students
+
+
+def _render_student(item):
+    student, entries = item
+    timetable, faculty_list, errors = build_timetable(entries)
+    return student, export_pdf(timetable, faculty_list, title=f"FFCS Timetable - {student}"), errors
+
+
+def _safe_filename(name):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name) or "student"
+
+
+def _archive_names(students):
+    # student -> PDF name in the zip, unique even where _safe_filename is not
+    # ("A B" and "A_B"); compared case-insensitively for case-insensitive filesystems
+    names, used = {}, set()
+    for student in students:
+        base = _safe_filename(student)
+        name, n = f"{base}.pdf", 1
+        while name.lower() in used:
+            n += 1
+            name = f"{base}-{n}.pdf"
+        used.add(name.lower())
+        names[student] = name
+    return names
+
+
+# The export runs on a click in the app: a few workers at most, and small
+# batches render in-process, where starting a pool costs more than it saves
+MAX_RENDER_WORKERS = 4
+MIN_POOL_BATCH = 16
+
+
+def batch_export_zip(students, out, workers=None, mp_context=None):
+    # One PDF per student, rendered in a process pool (in-process for small
+    # batches) and written into the zip (a path or a binary file object) as each
+    # one finishes. Returns {student: errors}. Callers inside a threaded server
+    # should pass a "spawn" mp_context: forking there can copy a held lock.
+    workers = workers or min(os.cpu_count() or 1, MAX_RENDER_WORKERS)
+    names = _archive_names(students)
+    report = {}
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        def write(rendered):
+            for student, pdf_bytes, errors in rendered:
+                archive.writestr(names[student], pdf_bytes)
+                report[student] = errors
+
+        if workers > 1 and len(students) >= MIN_POOL_BATCH:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+                write(pool.map(_render_student, students.items(), chunksize=8))
+        else:
+            write(map(_render_student, students.items()))
+    return report
+
+
+def batch_export_pdf(students, out):
+    # All students in one multi-page PDF (FPDF builds a single document, so this
+    # runs in-process). Returns (pdf_bytes or None, {student: errors}); with a path
+    # for out the PDF is written there instead of returned.
+    pdf = new_pdf()
+    report = {}
+    for student, entries in students.items():
+        timetable, faculty_list, errors = build_timetable(entries)
+        draw_timetable_page(pdf, timetable, faculty_list, title=f"FFCS Timetable - {student}")
+        report[student] = errors
+    if isinstance(out, str):
+        pdf.output(out, "F")
+        return None, report
+    return pdf.output(dest="S").encode("latin1"), report
+
+
+if __name__ == "__main__":
+    # python timetable_render.py batch students.csv out.zip|out.pdf [workers]
+    if len(sys.argv) < 4 or sys.argv[1] != "batch":
+        sys.exit("usage: python timetable_render.py batch students.csv out.zip|out.pdf [workers]")
+    with open(sys.argv[2], newline="") as f:
+        batch = read_batch_csv(f.read())
+    if sys.argv[3].endswith(".pdf"):
+        _, batch_report = batch_export_pdf(batch, sys.argv[3])
+    else:
+        batch_report = batch_export_zip(batch, sys.argv[3], workers=int(sys.argv[4]) if len(sys.argv) > 4 else None)
+    for name, problems in batch_report.items():
+        for problem in problems:
+            print(f"{name}: skipped {problem}")
+    print(f"{len(batch_report)} timetables written to {sys.argv[3]}")
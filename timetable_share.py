@@ -0,0 +1,136 @@
+import base64
+import binascii
+import functools
+import hashlib
+import zlib
+
+from slots import cell_to_slots, parse_slots, slot_to_cells
+
+# Compact, versioned encoding of the planner state for share links. Only the
+# faculty list is stored; the timetable is rebuilt from it. Layout:
+#   version (1 byte) | slot layout id (2 bytes) | deflate(body)
+#   body = n_strings, then (length, utf-8 bytes) per string,
+#          n_entries, then per entry: course_code, course_name, faculty, room
+#          (indices into the string table) and a bitset of its slots
+# All integers are unsigned LEB128 varints. Strings repeated across entries
+# (a faculty teaching two courses, a shared room) are stored once.
+SHARE_VERSION = 1
+SHARE_PARAM = "tt"
+
+
+def _natural_key(slot):
+    letters = slot.rstrip("0123456789")
+    return letters, int(slot[len(letters):] or 0)
+
+
+# Bit i of an entry's bitset is SHARE_SLOTS[i]; natural order (A1, A2, ..., L9,
+# L10, ..., TA1), which is also the order a decoded entry lists its slots in
+SHARE_SLOTS = tuple(sorted(slot_to_cells, key=_natural_key))
+_SLOT_BIT = {slot: i for i, slot in enumerate(SHARE_SLOTS)}
+# Links made against a different slot layout would decode to the wrong slots
+LAYOUT_ID = hashlib.blake2b("+".join(SHARE_SLOTS).encode(), digest_size=2).digest()
+_STRING_FIELDS = ("course_code", "course_name", "faculty", "room")
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_timetable(faculty_list):
+    # URL-safe token for faculty_list; raises ValueError on a slot the layout doesn't know
+    strings = {}
+    entries = []
+    for entry in faculty_list:
+        bits = 0
+        for slot in parse_slots(entry.get("slots", "")):
+            if slot not in _SLOT_BIT:
+                raise ValueError(f"invalid slot {slot}")
+            bits |= 1 << _SLOT_BIT[slot]
+        indices = [strings.setdefault(str(entry.get(field, "")), len(strings)) for field in _STRING_FIELDS]
+        entries.append((indices, bits))
+    body = bytearray()
+    _write_varint(body, len(strings))
+    for text in strings:  # dicts keep insertion order, which is index order
+        data = text.encode("utf-8")
+        _write_varint(body, len(data))
+        body += data
+    _write_varint(body, len(entries))
+    for indices, bits in entries:
+        for index in indices:
+            _write_varint(body, index)
+        _write_varint(body, bits)
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    packed = bytes([SHARE_VERSION]) + LAYOUT_ID + compressor.compress(bytes(body)) + compressor.flush()
+    return base64.urlsafe_b64encode(packed).rstrip(b"=").decode("ascii")
+
+
+@functools.lru_cache(maxsize=1024)
+def decode_share(token):
+    # (entries, placements): entries as tuples in FACULTY_FIELDS order, and
+    # ((cell, entry index), ...) for every cell they fill. Popular links are
+    # decoded once per process; the slots came from a bitset over the layout,
+    # so nothing is re-validated. Raises ValueError on a bad or stale token.
+    try:
+        packed = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        if len(packed) < 3 or packed[0] != SHARE_VERSION:
+            raise ValueError("unsupported share link version")
+        if packed[1:3] != LAYOUT_ID:
+            raise ValueError("share link was made for a different slot layout")
+        body = zlib.decompress(packed[3:], -15)
+        count, pos = _read_varint(body, 0)
+        strings = []
+        for _ in range(count):
+            length, pos = _read_varint(body, pos)
+            if pos + length > len(body):
+                raise ValueError("truncated share link")
+            strings.append(body[pos:pos + length].decode("utf-8"))
+            pos += length
+        count, pos = _read_varint(body, pos)
+        entries = []
+        placements = []
+        for index in range(count):
+            fields = []
+            for _ in _STRING_FIELDS:
+                string_index, pos = _read_varint(body, pos)
+                fields.append(strings[string_index])
+            bits, pos = _read_varint(body, pos)
+            if bits >> len(SHARE_SLOTS):
+                raise ValueError("share link names slots outside the layout")
+            slots = []
+            while bits:
+                low = bits & -bits
+                slots.append(SHARE_SLOTS[low.bit_length() - 1])
+                bits ^= low
+            course_code, course_name, faculty, room = fields
+            entries.append((course_code, course_name, faculty, "+".join(slots), room))
+            placements.extend((cell, index) for slot in slots for cell in slot_to_cells[slot])
+    except (binascii.Error, zlib.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"malformed share link ({e})") from None
+    return tuple(entries), tuple(placements)
+
+
+def load_shared(token):
+    # Fresh (timetable, faculty_list) for the planner's session state
+    entries, placements = decode_share(token)
+    faculty_list = [
+        {"course_code": course_code, "course_name": course_name, "faculty": faculty, "slots": slots, "room": room}
+        for course_code, course_name, faculty, slots, room in entries
+    ]
+    timetable = dict.fromkeys(cell_to_slots)
+    for cell, index in placements:
+        timetable[cell] = faculty_list[index]
+    return timetable, faculty_list
@@ -0,0 +1,123 @@
+import heapq
+import itertools
+
+from slots import parse_slots, slot_mask, slot_day_mask, slot_time_map, slot_to_cells
+
+EIGHT_AM = 8 * 60
+
+# Default preference weights; a weight of 0 switches that preference off
+DEFAULT_WEIGHTS = {
+    "early": 1.0,  # per 8 AM class in the week
+    "days": 2.0,  # per day on campus
+    "rating": 1.0,  # per point of average faculty rating (0-10), rewarded
+}
+
+
+def prepare_option(slot_str):
+    # (mask, day_mask, early_classes) for one slot combination, or None if it is
+    # invalid or clashes with itself
+    mask = 0
+    day_mask = 0
+    early = 0
+    for slot in parse_slots(slot_str):
+        if slot not in slot_mask or mask & slot_mask[slot]:
+            return None
+        mask |= slot_mask[slot]
+        day_mask |= slot_day_mask[slot]
+        early += sum(1 for day, _ in slot_to_cells[slot] if slot_time_map.get((day, slot), (None,))[0] == EIGHT_AM)
+    return mask, day_mask, early
+
+
+def solve(courses, faculty_rating=None, weights=None, top_k=5, max_nodes=200_000):
+    # courses: [{"course_code": ..., "options": [{"faculty": ..., "slots": "A1+TA1"}, ...]}, ...]
+    # faculty_rating: optional callable faculty name -> rating out of 10 (or None if unrated)
+    # Returns (solutions, complete), best first. Each solution is
+    # {"cost", "choices", "days", "early", "rating"}, where choices[i] is the chosen
+    # option index of courses[i]. complete is False if max_nodes cut the search short.
+    weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+    n_courses = len(courses)
+    if not n_courses:
+        return [], True
+
+    # Per option: (additive cost, mask, day_mask, early, rating, option index)
+    prepared = []
+    for course in courses:
+        options = []
+        for option_index, option in enumerate(course["options"]):
+            parsed = prepare_option(option["slots"])
+            if parsed is None:
+                continue
+            mask, day_mask, early = parsed
+            rating = faculty_rating(option.get("faculty", "")) if faculty_rating else None
+            rating = 0.0 if rating is None else float(rating)
+            additive = weights["early"] * early - weights["rating"] * rating / n_courses
+            options.append((additive, mask, day_mask, early, rating, option_index))
+        if not options:
+            return [], True
+        options.sort()
+        prepared.append(options)
+
+    # Most constrained course first; cheapest option first within a course
+    order = sorted(range(n_courses), key=lambda i: len(prepared[i]))
+    levels = [prepared[i] for i in order]
+
+    # Optimistic cost of the courses still to place (cheapest option each)
+    remaining_bound = [0.0] * (n_courses + 1)
+    for level in range(n_courses - 1, -1, -1):
+        remaining_bound[level] = remaining_bound[level + 1] + levels[level][0][0]
+
+    best = []  # max-heap on cost via (-cost, tiebreak, solution)
+    counter = itertools.count()
+    nodes = 0
+    chosen = [None] * n_courses
+
+    def search(level, used, day_mask, additive):
+        nonlocal nodes
+        nodes += 1
+        if nodes > max_nodes:
+            return False
+        n_days = bin(day_mask).count("1")
+        # Days on campus can only grow, so this is a valid lower bound
+        bound = additive + remaining_bound[level] + weights["days"] * n_days
+        if len(best) == top_k and bound >= -best[0][0]:
+            return True
+        if level == n_courses:
+            picks = [None] * n_courses
+            early = 0
+            rating = 0.0
+            for lvl, option in enumerate(chosen):
+                picks[order[lvl]] = option[5]
+                early += option[3]
+                rating += option[4]
+            solution = {"cost": bound, "choices": picks, "days": n_days, "early": early, "rating": rating / n_courses}
+            entry = (-bound, next(counter), solution)
+            if len(best) < top_k:
+                heapq.heappush(best, entry)
+            else:
+                heapq.heapreplace(best, entry)
+            return True
+        for option in levels[level]:
+            if used & option[1]:
+                continue
+            chosen[level] = option
+            if not search(level + 1, used | option[1], day_mask | option[2], additive + option[0]):
+                return False
+        return True
+
+    complete = search(0, 0, 0, 0.0)
+    solutions = [solution for _, _, solution in sorted(best, key=lambda entry: (-entry[0], entry[1]))]
+    return solutions, complete
+
+
+def parse_course_options(text):
+    # One option per line: "COURSE CODE | Faculty | A1+TA1"; lines sharing a
+    # course code are alternatives for that course
+    courses = {}
+    for line in text.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) < 3 or not parts[0] or not parts[2]:
+            continue
+        course = courses.setdefault(parts[0].upper(), {"course_code": parts[0].upper(), "options": []})
+        course["options"].append({"faculty": parts[1], "slots": parts[2]})
+    return list(courses.values())
+
@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import threading
+import time
+
+from reviews import clean_name
+from slots import parse_slots, slot_to_cells
+
+TIMETABLE_DB_PATH = os.environ.get("TIMETABLE_DB_PATH", "timetables.db")
+
+# One row per saved timetable, per course in it, and per grid cell it fills.
+# occupancy is denormalized so each planner question is one covering-index lookup.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS timetables (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL UNIQUE,         -- the saver's client token; saving again replaces
+    saved REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timetable_id INTEGER NOT NULL REFERENCES timetables (id) ON DELETE CASCADE,
+    course_code TEXT NOT NULL,
+    faculty TEXT NOT NULL,
+    faculty_key TEXT NOT NULL,
+    room TEXT NOT NULL,
+    slots TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_faculty ON entries (faculty_key, course_code, timetable_id);
+CREATE INDEX IF NOT EXISTS entries_timetable ON entries (timetable_id);
+CREATE TABLE IF NOT EXISTS occupancy (
+    entry_id INTEGER NOT NULL REFERENCES entries (id) ON DELETE CASCADE,
+    timetable_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    slot TEXT NOT NULL,
+    course_code TEXT NOT NULL,
+    faculty_key TEXT NOT NULL,
+    room TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS occupancy_slot ON occupancy (slot, course_code, faculty_key, timetable_id);
+CREATE INDEX IF NOT EXISTS occupancy_cell ON occupancy (day, period, room);
+CREATE INDEX IF NOT EXISTS occupancy_entry ON occupancy (entry_id);
+CREATE TABLE IF NOT EXISTS rooms (room TEXT PRIMARY KEY) WITHOUT ROWID;
+"""
+
+
+class TimetableStore:
+    # Timetables saved by users, shared by every session and process on the
+    # host, and indexed by grid cell, slot, course and faculty.
+    def __init__(self, path=TIMETABLE_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA foreign_keys=ON")
+            self._local.db = db
+        return db
+
+    # --- Writes ---
+    def save(self, owner, faculty_list):
+        # Replaces owner's saved timetable with faculty_list in one transaction.
+        # Entries with unknown slots are stored without occupancy.
+        with self._connect() as db:
+            db.execute("DELETE FROM timetables WHERE owner = ?", (owner,))
+            if not faculty_list:
+                return None
+            timetable_id = db.execute("INSERT INTO timetables (owner, saved) VALUES (?, ?)",
+                                      (owner, time.time())).lastrowid
+            for entry in faculty_list:
+                course_code = str(entry.get("course_code", "")).strip().upper()
+                faculty = str(entry.get("faculty", "")).strip()
+                room = str(entry.get("room", "")).strip().upper()
+                slots = [slot for slot in parse_slots(entry.get("slots", "")) if slot in slot_to_cells]
+                entry_id = db.execute(
+                    "INSERT INTO entries (timetable_id, course_code, faculty, faculty_key, room, slots) VALUES (?, ?, ?, ?, ?, ?)",
+                    (timetable_id, course_code, faculty, clean_name(faculty), room, "+".join(slots)),
+                ).lastrowid
+                db.executemany(
+                    "INSERT INTO occupancy (entry_id, timetable_id, day, period, slot, course_code, faculty_key, room) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(entry_id, timetable_id, day, period, slot, course_code, clean_name(faculty), room)
+                     for slot in slots for day, period in slot_to_cells[slot]],
+                )
+                if room:
+                    db.execute("INSERT OR IGNORE INTO rooms (room) VALUES (?)", (room,))
+            return timetable_id
+
+    def delete(self, owner):
+        with self._connect() as db:
+            db.execute("DELETE FROM timetables WHERE owner = ?", (owner,))
+
+    # --- Queries ---
+    def faculty_for(self, course_code, slot):
+        # [(faculty, students)] teaching course_code in slot, most picked first
+        rows = self._connect().execute(
+            "SELECT faculty_key, COUNT(DISTINCT timetable_id) FROM occupancy WHERE slot = ? AND course_code = ? "
+            "GROUP BY faculty_key ORDER BY 2 DESC",
+            (slot.strip().upper(), course_code.strip().upper()),
+        ).fetchall()
+        return [(self._faculty_name(key), students) for key, students in rows]
+
+    def _faculty_name(self, faculty_key):
+        row = self._connect().execute(
+            "SELECT faculty FROM entries WHERE faculty_key = ? LIMIT 1", (faculty_key,)
+        ).fetchone()
+        return row[0] if row else faculty_key
+
+    def occupied_rooms(self, slot, day=None):
+        # Rooms used during any cell of slot (on day, if given) in any saved timetable
+        cells = [(d, period) for d, period in slot_to_cells.get(slot.strip().upper(), ()) if day is None or d == day]
+        rooms = set()
+        db = self._connect()
+        for d, period in cells:
+            rooms.update(room for (room,) in db.execute(
+                "SELECT DISTINCT room FROM occupancy WHERE day = ? AND period = ? AND room != ''", (d, period)
+            ))
+        return rooms
+
+    def free_rooms(self, slot, day=None):
+        # Rooms seen in any saved timetable that nobody uses during slot (on day)
+        occupied = self.occupied_rooms(slot, day)
+        return [room for (room,) in self._connect().execute("SELECT room FROM rooms ORDER BY room") if room not in occupied]
+
+    def faculty_students(self, faculty, course_code=None):
+        # Number of saved timetables that picked faculty (for course_code, if given)
+        sql = "SELECT COUNT(DISTINCT timetable_id) FROM entries WHERE faculty_key = ?"
+        params = [clean_name(faculty)]
+        if course_code:
+            sql += " AND course_code = ?"
+            params.append(course_code.strip().upper())
+        return self._connect().execute(sql, params).fetchone()[0]
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM timetables").fetchone()[0]